@@ -1,11 +1,16 @@
 import dash
 from dash import dcc
 from dash import html
+from dash import Patch
+from flask import abort, jsonify, request
 from dash.dependencies import Input, Output
-from visualise import fig, rules, themes, genres
-import plotly.graph_objects as go
-import plotly.colors as pc
-import re
+from visualise import startup_timings, rule_arrays, rule_strings, rules_version, hover_lookup, lod_point_limit, antecedent_masks, consequent_masks, theme_mask, genre_mask, range_index, antecedent_postings, consequent_postings
+from ruleIndex import contains_any, range_query, range_filter, intersect_rows, rows_containing_all
+import numpy as np
+import os
+import filterCache
+from payloads import typed_array, visible_range, aggregate_points
+from artifacts import unpack_strings
 
 
 app = dash.Dash(__name__, external_stylesheets=["https://stackpath.bootstrapcdn.com/bootstrap/4.3.1/css/bootstrap.min.css"], suppress_callback_exceptions=True)
@@ -14,7 +19,7 @@ app = dash.Dash(__name__, external_stylesheets=["https://stackpath.bootstrapcdn.
 # By default: '/' will display scatter graph
 app.layout = html.Div([
     # NOTE: Below is an implementation for a navigation bar element that links to heatmap.
-    # Heatmap is currently not included in current implementation.
+    # The heatmap page is available at '/heatmap' (see pages/heatmap.py) once dataProcessing.py has written heatmap.npz.
 
     # html.Nav(
     #     children=[
@@ -28,20 +33,7 @@ app.layout = html.Div([
 
 
 
-# Using regex statement to extract upper and lower values from a review score bin (in antecedents)
-# For example: Review Score 80-85 will return two integers: 80, 85
-def get_review_score_range(antecedent_str):
-    match = re.search(r'Review Score: (\d+)-(\d+)', antecedent_str)
-    if match:
-        return int(match.group(1)), int(match.group(2))
-    return None, None
-
-
-
-
-
 # Callback functionality to display webpage contents based on current URL
-# NOTE: Heatmap is not included in current implementation.
 @app.callback(
     Output('page-content', 'children'),
     Input('url', 'pathname')
@@ -49,11 +41,11 @@ def get_review_score_range(antecedent_str):
 
 def display_page(path):
     if path == '/heatmap':
-        from pages.heatmap import layout
-        return layout
+        from pages.heatmap import get_layout    # Retrieves heatmap & layout from /pages/heatmap.py
+        return get_layout()
     elif path == '/':
-        from pages.scatter import layout        # Retrieves scatter graph & layout from /pages/scatter.py
-        return layout
+        from pages.scatter import get_layout    # Retrieves scatter graph & layout from /pages/scatter.py
+        return get_layout()
     else:
         return html.H1("404 Page Not Found")    # Displays 404 message is page is invalid
     
@@ -63,6 +55,75 @@ def display_page(path):
 
 
 
+# Method to return the row positions of every rule matching the callback inputs (see filter_scatter below)
+def filter_rules(range_occurrences, range_confidence, range_lift, range_review_score, direction_filter, theme_selection, genre_selection):
+
+    # Creating pairings of minimum & maximum slider values
+    min_occurrences, max_occurrences = range_occurrences
+    min_confidence, max_confidence = range_confidence
+    min_lift, max_lift = range_lift
+    min_score, max_score = range_review_score
+
+    # Initializes empty list if no themes or genres are selected
+    if theme_selection is None:
+        theme_selection = []
+    if genre_selection is None:
+        genre_selection = []
+
+    # Inclusive min&max slider values for each filtered column
+    bounds = {
+        'occurrences': (min_occurrences, max_occurrences),
+        'confidence': (min_confidence, max_confidence),
+        'lift': (min_lift, max_lift),
+        'review_min': (min_score, max_score)
+    }
+
+
+    # Theme/Genre selection filters
+    # This will filter the scatter graph to ONLY rules containing chosen themes & genres in antecedent OR consequent
+    # - Compatible with multiple tag selection & rule direction filtering
+    # - Candidate rules are found by intersecting the posting lists of the selected items (see ruleIndex.py),
+    #   and only those candidates are then checked against the slider values
+    if theme_selection or genre_selection:
+        candidates = None
+
+        if theme_selection:
+            candidates = intersect_rows(candidates, np.union1d(rows_containing_all(antecedent_postings, theme_selection),
+                                                               rows_containing_all(consequent_postings, theme_selection)))
+        if genre_selection:
+            candidates = intersect_rows(candidates, np.union1d(rows_containing_all(antecedent_postings, genre_selection),
+                                                               rows_containing_all(consequent_postings, genre_selection)))
+
+        # Functionality for compatibility of theme_selection and genre_selection with rule direction filtering
+        # Selected themes must be in the antecedents & selected genres in the consequents (or vice versa)
+        if direction_filter == 'themes>genres':
+            candidates = intersect_rows(candidates, rows_containing_all(antecedent_postings, theme_selection))
+            candidates = intersect_rows(candidates, rows_containing_all(consequent_postings, genre_selection))
+        elif direction_filter == 'genres>themes':
+            candidates = intersect_rows(candidates, rows_containing_all(antecedent_postings, genre_selection))
+            candidates = intersect_rows(candidates, rows_containing_all(consequent_postings, theme_selection))
+
+        filtered_rows = range_filter(range_index, bounds, candidates)
+
+    else:
+        # Filtering the rules DataFrame based on min&max slider values (sent from parameters)
+        # The range index only visits candidate rows of the most selective slider (see ruleIndex.py)
+        filtered_rows = range_query(range_index, bounds)
+
+        # Functionality for base direction filter (no theme_selection or genre_selection arguments applied)
+        # Uses the precomputed rule bitmasks to check for any themes/genres on each side of the rule
+        antecedents = antecedent_masks[filtered_rows]
+        consequents = consequent_masks[filtered_rows]
+
+        if direction_filter == 'themes>genres':
+            filtered_rows = filtered_rows[contains_any(antecedents, theme_mask) & ~contains_any(consequents, theme_mask) & contains_any(consequents, genre_mask)]
+        elif direction_filter == 'genres>themes':
+            filtered_rows = filtered_rows[contains_any(antecedents, genre_mask) & ~contains_any(consequents, genre_mask) & contains_any(consequents, theme_mask)]
+
+    return filtered_rows
+
+
+
 # SCATTER PLOT CALLBACK FUNCTIONALITY
 # Each input updates the same graph object, inputs can be found as Dash DCC and HTML components within scatter.py layout
 @app.callback(
@@ -74,122 +135,162 @@ def display_page(path):
         Input('slider-review-score', 'value'),  # Filtering review score (min & max values)
         Input('direction-filter', 'value'),     # Filtering rule direction from 'Themes > Genres', 'Genres > Themes', or 'All'
         Input('dropdown-themes', 'value'),      # Filtering graph to only include rules containing selected themes
-        Input('dropdown-genres', 'value')       # Filtering graph to only include rules containing selected genres
+        Input('dropdown-genres', 'value'),      # Filtering graph to only include rules containing selected genres
+        Input('scatter-plot', 'relayoutData')   # Current zoom/pan window of the graph (used for level-of-detail mode)
     ]
 )
 
 # Main application callback to update scatter graph, using parameters of sliders outlined above
-def filter_scatter(range_occurrences, range_confidence, range_lift, range_review_score, direction_filter, theme_selection, genre_selection):
+def filter_scatter(range_occurrences, range_confidence, range_lift, range_review_score, direction_filter, theme_selection, genre_selection, relayout_data=None):
 
-    # Reassigning fig to avoid shared state
-    fig_copy = go.Figure(fig)
+    # Filtering rules, reusing previous results for the same (normalized) inputs (see filterCache.py)
+    cache_key = filterCache.make_key(rules_version, [range_occurrences, range_confidence, range_lift, range_review_score],
+                                     direction_filter, theme_selection, genre_selection)
+    filtered_rows = filterCache.cached(cache_key, lambda: filter_rules(range_occurrences, range_confidence, range_lift, range_review_score,
+                                                                        direction_filter, theme_selection, genre_selection))
 
+    # Zooming/panning only changes the plotted points in level-of-detail mode (see below) - otherwise every rule matching the
+    # filters is already plotted, so nothing is sent back to the browser
+    if dash.ctx.triggered_id == 'scatter-plot' and len(filtered_rows) <= lod_point_limit:
+        return dash.no_update
 
-    # Creating pairings of minimum & maximum slider values
-    min_occurrences, max_occurrences = range_occurrences
-    min_confidence, max_confidence = range_confidence
-    min_lift, max_lift = range_lift
-    min_score, max_score = range_review_score
+    # Updating only the trace arrays that change with the filters, using a partial property update (Patch)
+    # The layout, coloraxis & hovertemplate of the figure (set once in visualise.py) are never re-sent to the browser
+    patched_fig = Patch()
 
-    # Filtering the rules DataFrame based on min&max slider values (sent from parameters)
-    # NOTE: scatter.py imports a 'fresh' unfiltered graph at the start of each callback
-    filtered_df = rules[(rules['occurrences'] >= min_occurrences) & (rules['occurrences'] <= max_occurrences) &
-                        (rules['confidence'] >= min_confidence) & (rules['confidence'] <= max_confidence) &
-                        (rules['lift'] >= min_lift) & (rules['lift'] <= max_lift) &
-                        (rules['antecedents_str'].apply(lambda x: min_score <= get_review_score_range(x)[0] <= max_score))
-                        ]
 
-    # Theme/Genre selection filters
-    # This will filter the scatter graph to ONLY rules containing chosen themes & genres in antecedent OR consequent
-    # - Compatible with multiple tag selection & rule direction filtering
-    if theme_selection:
-        filtered_df = filtered_df[filtered_df['antecedents'].apply(lambda x: all(theme in x for theme in theme_selection)) |
-                                  filtered_df['consequents'].apply(lambda x: all(theme in x for theme in theme_selection))]
-    
-    if genre_selection:
-        filtered_df = filtered_df[filtered_df['antecedents'].apply(lambda x: all(genre in x for genre in genre_selection)) |
-                                  filtered_df['consequents'].apply(lambda x: all(genre in x for genre in genre_selection))]
+    # Level-of-detail mode (see visualise.py)
+    # If too many rules match the filters, only rules within the visible window are plotted - and if there are still
+    # too many, a binned aggregate of the visible window is plotted instead of the individual rules.
+    if len(filtered_rows) > lod_point_limit:
+        occurrences = rule_arrays['occurrences'][filtered_rows]
+        confidence = rule_arrays['confidence'][filtered_rows]
 
+        x_low, x_high = visible_range(relayout_data, 'xaxis', (occurrences.min(), occurrences.max()))
+        y_low, y_high = visible_range(relayout_data, 'yaxis', (confidence.min(), confidence.max()))
 
-    # Method to filter rule direction based off user input
-    # Also considers selected themes & genres from above
-    def filter_direction(row, theme_selection, genre_selection):
-        antecedents = set(row['antecedents'])   # Converted to sets for easier processing
-        consequents = set(row['consequents'])
+        in_view = (occurrences >= x_low) & (occurrences <= x_high) & (confidence >= y_low) & (confidence <= y_high)
+        filtered_rows = filtered_rows[in_view]
 
-        # Initializes empty list if no themes or genres are selected
-        if theme_selection is None:
-            theme_selection = []
-        if genre_selection is None:
-            genre_selection = []
+        if len(filtered_rows) > lod_point_limit:
+            x, y, max_lift, counts = aggregate_points(occurrences[in_view], confidence[in_view], rule_arrays['lift'][filtered_rows],
+                                                      (x_low, x_high), (y_low, y_high))
 
-        # Specifying length of themes/genres within antecedents & consequents
-        theme_count_antecedent = len(antecedents & themes)
-        theme_count_consequent = len(consequents & themes)
-        
-        genre_count_antecedent = len(antecedents & genres)
-        genre_count_consequent = len(consequents & genres)
+            for key in ['x', 'y', 'customdata', 'text', 'hovertext']:
+                patched_fig['data'][0][key] = []
+            patched_fig['data'][0]['marker']['color'] = []
+            patched_fig['data'][0]['hoverlabel']['bgcolor'] = []
 
+            patched_fig['data'][1]['x'] = typed_array(x, 'f4')
+            patched_fig['data'][1]['y'] = typed_array(y, 'f4')
+            patched_fig['data'][1]['marker']['color'] = typed_array(max_lift, 'f4')
+            patched_fig['data'][1]['customdata'] = typed_array(np.column_stack([counts, max_lift]), 'f4')
+            return patched_fig
 
-        # Functionality for base direction filter (no theme_selection or genre_selection arguments applied)
-        if not theme_selection and not genre_selection:
-            if direction_filter == 'themes>genres':
-                return theme_count_antecedent > 0 and theme_count_consequent == 0 and genre_count_consequent > 0
-            elif direction_filter == 'genres>themes':
-                return genre_count_antecedent > 0 and genre_count_consequent == 0 and theme_count_consequent > 0
-            else:
-                return True
-
-        # Functionality for compatibility of theme_selection and genre_selection filtering
-        if direction_filter == 'themes>genres':
-            return (all(theme in antecedents for theme in theme_selection) if theme_selection else True) and \
-                (all(genre in consequents for genre in genre_selection) if genre_selection else True)
-        elif direction_filter =='genres>themes':
-            return (all(genre in antecedents for genre in genre_selection) if genre_selection else True) and \
-                (all(theme in consequents for theme in theme_selection) if theme_selection else True)
-        else:
-            return True
-    
-    # Applying direction filtering to new DataFrame that will be used to display updated scatter graph
-    filtered_df = filtered_df[filtered_df.apply(lambda row: filter_direction(row, theme_selection, genre_selection), axis=1)]
+    # Clearing the aggregate trace when individual rules are plotted
+    patched_fig['data'][1]['x'] = []
+    patched_fig['data'][1]['y'] = []
 
-    
-    # Re-updating hoverlabel data since it gets lost on callbacks
-    fig_copy.update_traces(
-        type='scattergl',
-        x=filtered_df['occurrences'], 
-        y=filtered_df['confidence'],
-        marker=dict(color=filtered_df['lift'], coloraxis="coloraxis"),
-        customdata=filtered_df[['antecedents_str', 'consequents_str', 'lift', 'occurrences']].values
-    )
 
+    # Selecting the columns of the filtered rules that will be used to display updated scatter graph
+    # NOTE: the Patch replaces these trace arrays within the figure currently displayed by the browser
+    filtered = {column: values[filtered_rows] for column, values in rule_arrays.items()}
 
-    # This sets the background colour of the hoverlabel to match colour of 'lift' based off the maximum value of lift within rules.
-    # Required for both initial visualisation & figure updates through callbacks.
-    colour_min = rules['lift'].min()
-    colour_max = rules['lift'].max()
-    
-    fig_copy.update_layout(
-        coloraxis = dict(
-            colorscale='Plasma',
-            cmin=colour_min,
-            cmax=colour_max
-        )
-    )   
-
-    max_lift = rules['lift'].max()
-
-    # Setting hoverlabel colour to match lift
-    fig_copy.update_traces(
-        hoverlabel=dict(
-            bgcolor=[
-                pc.sample_colorscale('Plasma', [lift / max_lift])[0]  
-                    for lift in filtered_df['lift']
-            ]
-        )
+    # Numeric arrays are sent as binary typed arrays (see payloads.py), downcast to the precision displayed on the graph
+    patched_fig['data'][0]['x'] = typed_array(filtered['occurrences'], 'i4')
+    patched_fig['data'][0]['y'] = typed_array(filtered['confidence'], 'f4')
+    patched_fig['data'][0]['marker']['color'] = typed_array(filtered['lift'], 'f4')
+
+    # In hover lookup mode only rule IDs are sent - otherwise antecedent & consequent strings are sent as the text & hovertext of each point
+    if hover_lookup:
+        patched_fig['data'][0]['customdata'] = typed_array(np.column_stack([filtered['lift'], filtered['occurrences'], filtered['rule_id']]), 'f8')
+    else:
+        patched_fig['data'][0]['customdata'] = typed_array(np.column_stack([filtered['lift'], filtered['occurrences']]), 'f4')
+        patched_fig['data'][0]['text'] = unpack_strings(rule_strings['antecedents_str'], filtered_rows)
+        patched_fig['data'][0]['hovertext'] = unpack_strings(rule_strings['consequents_str'], filtered_rows)
+
+    # Setting hoverlabel colour to match lift (precomputed for every rule in visualise.py)
+    patched_fig['data'][0]['hoverlabel']['bgcolor'] = filtered['hover_colour'].tolist()
+
+    return patched_fig
+
+
+
+# HOVER LOOKUP FUNCTIONALITY (only used when HOVER_LOOKUP=1, see visualise.py)
+# Method to return the details of a single rule from the in-memory rule arrays
+def rule_details(rule_id):
+    return {
+        'rule_id': int(rule_id),
+        'antecedents': unpack_strings(rule_strings['antecedents_str'], [rule_id])[0],
+        'consequents': unpack_strings(rule_strings['consequents_str'], [rule_id])[0],
+        'confidence': float(rule_arrays['confidence'][rule_id]),
+        'lift': float(rule_arrays['lift'][rule_id]),
+        'occurrences': int(rule_arrays['occurrences'][rule_id])
+    }
+
+
+# Endpoint returning the details of a rule as JSON, e.g. /rules/42
+# Rules only change when the app is redeployed, so responses can be cached by the browser (the ETag changes with the rules file)
+@app.server.route('/rules/<int:rule_id>')
+def rule_endpoint(rule_id):
+    if rule_id >= len(rule_arrays['rule_id']):
+        abort(404)
+
+    response = jsonify(rule_details(rule_id))
+    response.headers['Cache-Control'] = 'public, max-age=86400'
+    response.set_etag(f"{rules_version}-{rule_id}")
+    return response.make_conditional(request)
+
+
+# Callback displaying the antecedents & consequents of the hovered (or clicked) point above the scatter graph
+# Only registered in hover lookup mode - otherwise the rule-details element is not in the layout & customdata has no rule IDs
+if hover_lookup:
+    @app.callback(
+        Output('rule-details', 'children'),
+        [
+            Input('scatter-plot', 'hoverData'),
+            Input('scatter-plot', 'clickData')
+        ]
     )
 
-    return fig_copy
+    def display_rule_details(hover_data, click_data):
+        point_data = hover_data or click_data
+        if not point_data:
+            return "Hover over a rule to display its antecedents & consequents"
+
+        # Points of the level-of-detail aggregate trace (curveNumber 1) are bins of rules, not a single rule
+        point = point_data['points'][0]
+        if point.get('curveNumber') != 0 or len(point.get('customdata') or []) < 3:
+            return dash.no_update
+
+        details = rule_details(int(point['customdata'][2]))
+        return [html.B("Antecedents: "), details['antecedents'], html.Br(), html.B("Consequents: "), details['consequents']]
+
+
+# Callback switching the review score displayed by the heatmap (each figure is built once, see get_figure() in pages/heatmap.py)
+@app.callback(
+    Output('heatmap', 'figure'),
+    Input('heatmap-score', 'value'),
+    prevent_initial_call=True
+)
+
+def update_heatmap(score):
+    from pages.heatmap import get_figure
+    return get_figure(score)
+
+
+
+# Endpoint displaying filter cache hit/miss counters for the current worker (see filterCache.py)
+@app.server.route('/cache-stats')
+def cache_stats():
+    return {**filterCache.stats, 'cached_results': len(filterCache._local), 'cached_bytes': filterCache._local_bytes, 'pid': os.getpid()}
+
+
+# Endpoint displaying the time taken by each start-up phase of the current worker, in milliseconds (see visualise.py)
+@app.server.route('/startup-timings')
+def startup_timing():
+    return {'phases': [{'phase': name, 'ms': ms} for name, ms in startup_timings.items()],
+            'total': round(sum(startup_timings.values()), 1), 'pid': os.getpid()}
 
 
 
@@ -0,0 +1,204 @@
+# Importing libraries
+import os
+import time
+import pickle                       # For the warm-start snapshot & stage checkpoints
+import hashlib
+import numpy as np                  # For binary array storage
+import pandas as pd                 # For data structuring & manipulation
+
+
+
+# Precompiled rules artifact
+# rules.csv stores antecedents/consequents as "frozenset({...})" strings which have to be parsed again on every start-up.
+# The artifact stores the same rules in binary columnar form (a NumPy .npz file):
+# - items:        shared item dictionary (every theme, genre & review bin appearing in a rule, sorted by name)
+# - *_offsets:    start/end positions of each rule's items (CSR layout, one more entry than there are rules)
+# - *_codes:      integer codes into the item dictionary, sorted by item name within each rule
+# - metrics:      2D float array of every numeric rule metric, with column names stored in metric_names
+RULES_ARTIFACT = 'rules.npz'
+
+
+
+# Method to integer-encode a column of frozensets into CSR offsets & codes using the item dictionary
+def _encode_itemsets(itemsets, item_index):
+    lengths = np.fromiter((len(itemset) for itemset in itemsets), dtype=np.int64, count=len(itemsets))
+    offsets = np.zeros(len(itemsets) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+
+    # Sorting item codes within each rule (the dictionary is sorted, so this matches sorted item names)
+    codes = np.fromiter((code for itemset in itemsets for code in sorted(item_index[item] for item in itemset)),
+                        dtype=np.int32, count=offsets[-1])
+    return offsets, codes
+
+
+# Method to write a rules DataFrame (as returned by association_rules) to the binary artifact
+def save_rules(rules, path=RULES_ARTIFACT):
+    items = sorted(set().union(*rules['antecedents'], *rules['consequents']))
+    item_index = {item: i for i, item in enumerate(items)}
+
+    antecedent_offsets, antecedent_codes = _encode_itemsets(rules['antecedents'].tolist(), item_index)
+    consequent_offsets, consequent_codes = _encode_itemsets(rules['consequents'].tolist(), item_index)
+
+    metric_names = [column for column in rules.columns if pd.api.types.is_numeric_dtype(rules[column])]
+
+    np.savez(path,
+             items=np.array(items, dtype=str),
+             antecedent_offsets=antecedent_offsets,
+             antecedent_codes=antecedent_codes,
+             consequent_offsets=consequent_offsets,
+             consequent_codes=consequent_codes,
+             metric_names=np.array(metric_names, dtype=str),
+             metrics=rules[metric_names].to_numpy(dtype=np.float64))
+
+
+# Method to load the binary artifact back into a rules DataFrame, without any string parsing
+# Returns the same columns as rules.csv: antecedents/consequents as frozensets, each metric, and antecedents_str/consequents_str.
+# item_label can be used to change how items are displayed within antecedents_str/consequents_str (e.g. reformatting review bins).
+def load_rules(path=RULES_ARTIFACT, item_label=None):
+    with np.load(path, allow_pickle=False) as artifact:
+        items = artifact['items'].tolist()
+        labels = [item_label(item) for item in items] if item_label else items
+
+        itemsets = {}
+        strings = {}
+        for side in ['antecedent', 'consequent']:
+            offsets = artifact[side + '_offsets'].tolist()
+            codes = artifact[side + '_codes'].tolist()
+            rule_codes = [codes[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
+            itemsets[side + 's'] = [frozenset(items[code] for code in row) for row in rule_codes]
+            strings[side + 's_str'] = [', '.join(labels[code] for code in row) for row in rule_codes]
+
+        metrics = pd.DataFrame(artifact['metrics'], columns=artifact['metric_names'].tolist())
+
+    # Restoring the column order of rules.csv (antecedents, consequents, metrics..., antecedents_str, consequents_str)
+    return pd.concat([pd.DataFrame(itemsets), metrics, pd.DataFrame(strings)], axis=1)
+
+
+
+# Packed string columns
+# A list of strings stored as one UTF-8 byte buffer & offsets (string i is buffer[offsets[i]:offsets[i + 1]]), the same
+# layout as the encoded itemsets above. Unlike a fixed-width unicode array, strings are not padded to the longest string,
+# and unlike a list of Python strings, reading them never writes to their memory (see rule_strings in visualise.py).
+
+# Method to pack a list of strings into a (buffer, offsets) pair
+def pack_strings(strings):
+    encoded = [string.encode('utf-8') for string in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum(np.fromiter((len(string) for string in encoded), dtype=np.int64, count=len(encoded)), out=offsets[1:])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+
+# Method to return the strings at the given row positions of a (buffer, offsets) pair as a list
+def unpack_strings(packed, rows):
+    buffer, offsets = packed
+    return [buffer[offsets[row]:offsets[row + 1]].tobytes().decode('utf-8') for row in rows]
+
+
+
+# Item vocabulary manifest
+# Every item that can appear within a rule (each genre, theme & review bin) and its category, stored as a small .csv file
+# with one row per item & category. Some tags (e.g. Survival, Stealth) are both a genre & a theme, so they appear once for each.
+# visualise.py loads this instead of the one-hot df_genres/df_themes/df_reviews.csv files, which it only needs the columns of.
+ITEM_VOCABULARY = 'items.csv'
+
+
+# Method to write the manifest from a dictionary of category -> items (e.g. {'genre': genreList, 'theme': themeList, ...})
+def save_item_vocabulary(categories, path=ITEM_VOCABULARY):
+    pd.DataFrame([(item, category) for category, items in categories.items() for item in items],
+                 columns=['item', 'category']).to_csv(path, index=False)
+
+
+# Method to load the manifest back into a dictionary of category -> set of items
+def load_item_vocabulary(path=ITEM_VOCABULARY):
+    vocabulary = pd.read_csv(path, dtype=str, keep_default_na=False)
+    return {category: set(group['item']) for category, group in vocabulary.groupby('category', sort=False)}
+
+
+
+# Theme x genre heatmap artifact
+# Stores the number of games & the sum of their review scores for every theme & genre combination (see review_heatmap()
+# in preprocessing.py), for each review score (e.g. percent_positive & log_rating). Displayed by pages/heatmap.py.
+HEATMAP_ARTIFACT = 'heatmap.npz'
+
+
+# Method to write the heatmap artifact
+# review_sums is a dictionary of score name -> 2D array of review sums (themes x genres)
+def save_heatmap(themes, genres, counts, review_sums, path=HEATMAP_ARTIFACT):
+    np.savez(path,
+             themes=np.array(themes, dtype=str),
+             genres=np.array(genres, dtype=str),
+             counts=counts,
+             scores=np.array(list(review_sums), dtype=str),
+             review_sums=np.stack(list(review_sums.values())))
+
+
+# Method to load the heatmap artifact back into themes, genres, counts & a dictionary of score name -> review sums
+def load_heatmap(path=HEATMAP_ARTIFACT):
+    with np.load(path, allow_pickle=False) as artifact:
+        review_sums = dict(zip(artifact['scores'].tolist(), artifact['review_sums']))
+        return artifact['themes'].tolist(), artifact['genres'].tolist(), artifact['counts'], review_sums
+
+
+
+# Method to return an MD5 hash of the contents of every file in paths (and any extra values, e.g. settings)
+# Used to detect when an artifact or snapshot built from those files is out of date
+def content_hash(paths, *extra):
+    digest = hashlib.md5()
+    for path in paths:
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                digest.update(block)
+    for value in extra:
+        digest.update(repr(value).encode())
+    return digest.hexdigest()
+
+
+
+# Warm-start snapshot
+# A pickle of fully prepared start-up state (see visualise.py), stored alongside the hash of the files it was built from.
+# The key is written before the state, so an out-of-date snapshot is rejected without unpickling the state itself.
+
+# Method to write a snapshot (written to a temporary file first, so other workers never read a partially written snapshot)
+def save_snapshot(state, key, path):
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'wb') as file:
+        pickle.dump(key, file, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary, path)
+
+
+# Method to load a snapshot, returning None if it is missing, unreadable or was built with a different key
+def load_snapshot(path, key):
+    try:
+        with open(path, 'rb') as file:
+            if pickle.load(file) != key:
+                return None
+            return pickle.load(file)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return None
+
+
+
+# Pipeline stage checkpoints (see dataProcessing.py)
+# Each stage's result is stored as a snapshot (see above) keyed by a hash of the stage's inputs & parameters.
+# Keys are chained (each key includes the key of the stage before it), so changing a parameter only reruns the stages after it.
+CHECKPOINT_DIR = 'checkpoints'
+
+
+# Method to return the checkpointed result of a stage, or run stage() & checkpoint its result if the key has changed
+# outputs lists files written by the stage - the stage is also rerun if any of them are missing
+def run_stage(name, key, stage, outputs=(), rerun=False, directory=CHECKPOINT_DIR):
+    path = os.path.join(directory, f"{name}.pkl")
+    if not rerun and all(os.path.exists(output) for output in outputs):
+        result = load_snapshot(path, key)
+        if result is not None:
+            print(f"Stage '{name}': inputs unchanged, loaded checkpoint")
+            return result
+
+    start = time.perf_counter()
+    result = stage()
+    os.makedirs(directory, exist_ok=True)
+    save_snapshot(result, key, path)
+    print(f"Stage '{name}': took {time.perf_counter() - start:.1f} s")
+    return result
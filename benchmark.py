@@ -0,0 +1,417 @@
+# Benchmarks for the rule filtering & mining engines
+# Usage: py benchmark.py               (runs every benchmark)
+#        py benchmark.py range_index   (runs a single benchmark by name)
+# NOTE: worker_memory starts the app with gunicorn, so it requires the files output by dataProcessing.py & Linux (/proc)
+
+# Importing libraries
+import os
+import sys
+import json
+import math
+import time
+import socket
+import tracemalloc
+import subprocess
+import urllib.request
+import numpy as np                  # For synthetic data generation
+import pandas as pd                 # For data structuring & manipulation
+from plotly.io.json import to_json_plotly
+from mlxtend.frequent_patterns import fpgrowth, association_rules
+from ruleIndex import build_range_index, range_query
+from mining import parallel_fpgrowth, eclat, constrained_rules, mine_itemsets, filter_itemsets
+from preprocessing import append_new_columns, review_heatmap
+from payloads import typed_array
+
+
+
+# Method to generate a synthetic rules DataFrame with the same slider columns as visualise.py
+def synthetic_rules(rule_count, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'occurrences': rng.integers(24, 1500, rule_count).astype(float),
+        'confidence': rng.uniform(0.5, 1.0, rule_count),
+        'lift': rng.lognormal(1.0, 0.8, rule_count),
+        'review_min': rng.integers(0, 20, rule_count) * 5,
+        'antecedents_str': [f"Exploration, Retro, Review Score: {i % 20 * 5}-{i % 20 * 5 + 5}" for i in range(rule_count)],
+        'consequents_str': ['Atmospheric'] * rule_count
+    })
+
+
+# Method to generate a synthetic one-hot DataFrame of games x items (like df_final in dataProcessing.py)
+# Each game belongs to one of several clusters of related items, so itemsets of several items are frequent
+def synthetic_transactions(game_count, item_count, seed=0, cluster_count=20):
+    rng = np.random.default_rng(seed)
+    base = rng.uniform(0.001, 0.03, item_count)
+    clusters = rng.random((cluster_count, item_count)) < 0.05
+    probability = np.minimum(base + clusters[rng.integers(0, cluster_count, game_count)] * 0.3, 1)
+    return pd.DataFrame(rng.random((game_count, item_count)) < probability, columns=[f"item {i}" for i in range(item_count)])
+
+
+# Method to generate a synthetic one-hot DataFrame with theme, genre & review bin columns (like df_final in dataProcessing.py)
+# Every game has exactly one review bin, which depends on a few of its themes & genres. Returns the DataFrame & item sets.
+def synthetic_games(game_count, tag_count, seed=0, bin_count=20):
+    rng = np.random.default_rng(seed)
+    tags = synthetic_transactions(game_count, tag_count, seed).to_numpy()
+
+    bins = (tags[:, 0] * 7 + tags[:, 1] * 11 + tags[:, tag_count // 2] * 3 + rng.integers(0, 2, game_count)) % bin_count
+    reviews = np.zeros((game_count, bin_count), dtype=bool)
+    reviews[np.arange(game_count), bins] = True
+
+    themes = [f"theme {i}" for i in range(tag_count // 2)]
+    genres = [f"genre {i}" for i in range(tag_count - tag_count // 2)]
+    review_bins = [f"review_bin_{i * 5}-{i * 5 + 5}" for i in range(bin_count)]
+    return pd.DataFrame(np.hstack([tags, reviews]), columns=themes + genres + review_bins), set(themes), set(genres), set(review_bins)
+
+
+# Method to return the time (in milliseconds) & peak traced memory (in MB) of calling function once
+def time_and_peak_memory(function):
+    tracemalloc.start()
+    start = time.perf_counter()
+    function()
+    elapsed = (time.perf_counter() - start) * 1000
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+# Method to return the average time (in milliseconds) of calling function over repeats
+def time_ms(function, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+
+# Full scan vs. range index lookup (see ruleIndex.py)
+# Each query narrows one or more sliders, as a user would when dragging them
+def benchmark_range_index(rule_counts=(10_000, 100_000, 1_000_000), repeats=20):
+    queries = {
+        'full range': {},
+        'narrow lift': {'lift': (20, 30)},
+        'narrow occurrences': {'occurrences': (100, 120)},
+        'narrow lift & confidence': {'lift': (10, 40), 'confidence': (0.9, 1.0)},
+    }
+
+    print("RANGE INDEX: full scan vs. indexed lookup (ms per query)")
+    print(f"{'rules':>10}  {'query':<26}{'scan':>10}{'index':>10}{'matches':>10}")
+
+    for rule_count in rule_counts:
+        rules = synthetic_rules(rule_count)
+        columns = ['occurrences', 'confidence', 'lift', 'review_min']     # The slider columns filtered by app.py
+        index = build_range_index(rules, columns)
+
+        for name, narrowed in queries.items():
+            bounds = {column: (rules[column].min(), rules[column].max()) for column in columns}
+            bounds.update(narrowed)
+
+            def full_scan():
+                matches = np.ones(len(rules), dtype=bool)
+                for column, (low, high) in bounds.items():
+                    matches &= (rules[column] >= low) & (rules[column] <= high)
+                return np.flatnonzero(matches)
+
+            assert np.array_equal(full_scan(), range_query(index, bounds))
+
+            print(f"{rule_count:>10}  {name:<26}{time_ms(full_scan, repeats):>10.3f}"
+                  f"{time_ms(lambda: range_query(index, bounds), repeats):>10.3f}{len(range_query(index, bounds)):>10}")
+    print()
+
+
+
+# JSON lists vs. binary typed arrays for the scatter trace arrays sent by the callback in app.py
+# Payloads are serialized with the same JSON encoder Dash uses for callback responses
+def benchmark_payload(rule_counts=(10_000, 100_000, 500_000), repeats=3):
+    print("TRACE PAYLOADS: JSON lists vs. binary typed arrays")
+    print(f"{'rules':>10}  {'payload':<26}{'bytes':>14}{'encode ms':>12}")
+
+    for rule_count in rule_counts:
+        rules = synthetic_rules(rule_count)
+
+        payloads = {
+            'json lists': lambda: {
+                'x': rules['occurrences'].to_numpy().tolist(),
+                'y': rules['confidence'].to_numpy().tolist(),
+                'color': rules['lift'].to_numpy().tolist(),
+                'customdata': rules[['antecedents_str', 'consequents_str', 'lift', 'occurrences']].values
+            },
+            'typed arrays': lambda: {
+                'x': typed_array(rules['occurrences'], 'i4'),
+                'y': typed_array(rules['confidence'], 'f4'),
+                'color': typed_array(rules['lift'], 'f4'),
+                'customdata': typed_array(rules[['lift', 'occurrences']], 'f4'),
+                'text': rules['antecedents_str'].tolist(),
+                'hovertext': rules['consequents_str'].tolist()
+            },
+        }
+
+        for name, payload in payloads.items():
+            size = len(to_json_plotly(payload()))
+            print(f"{rule_count:>10}  {name:<26}{size:>14,}{time_ms(lambda: to_json_plotly(payload()), repeats):>12.1f}")
+    print()
+
+
+
+# mlxtend fpgrowth vs. parallel_fpgrowth (see mining.py) on a fixed sample
+# The output of parallel_fpgrowth must be identical to fpgrowth (same itemsets, supports, order & index)
+def benchmark_parallel_mining(game_count=5000, item_count=80, min_supports=(0.01, 0.005, 0.0025), worker_counts=(1, 2, 4)):
+    transactions = synthetic_transactions(game_count, item_count)
+
+    print(f"PARALLEL FP-GROWTH: {game_count} games x {item_count} items (ms)")
+    print(f"{'min_support':>12}{'itemsets':>10}{'fpgrowth':>12}" + ''.join(f"{f'{workers} workers':>12}" for workers in worker_counts))
+
+    for min_support in min_supports:
+        expected = fpgrowth(transactions, min_support=min_support, use_colnames=True)
+        times = [time_ms(lambda: fpgrowth(transactions, min_support=min_support, use_colnames=True), 1)]
+
+        for workers in worker_counts:
+            assert parallel_fpgrowth(transactions, min_support=min_support, use_colnames=True, workers=workers).equals(expected)
+            times.append(time_ms(lambda: parallel_fpgrowth(transactions, min_support=min_support, use_colnames=True, workers=workers), 1))
+
+        print(f"{min_support:>12}{len(expected):>10}" + ''.join(f"{ms:>12.1f}" for ms in times))
+    print()
+
+
+
+# mlxtend fpgrowth vs. eclat (see mining.py) at several min_support values
+# eclat must output the same itemsets & supports as fpgrowth (its rows are in a different order)
+def benchmark_eclat(game_count=5000, item_count=80, min_supports=(0.01, 0.005, 0.0025, 0.001), repeats=3):
+    transactions = synthetic_transactions(game_count, item_count)
+
+    print(f"ECLAT: {game_count} games x {item_count} items (ms)")
+    print(f"{'min_support':>12}{'itemsets':>10}{'fpgrowth':>12}{'parallel':>12}{'eclat':>12}")
+
+    for min_support in min_supports:
+        expected = fpgrowth(transactions, min_support=min_support, use_colnames=True)
+        mined = eclat(transactions, min_support=min_support, use_colnames=True)
+        assert dict(zip(mined['itemsets'], mined['support'])) == dict(zip(expected['itemsets'], expected['support']))
+
+        print(f"{min_support:>12}{len(expected):>10}"
+              f"{time_ms(lambda: fpgrowth(transactions, min_support=min_support, use_colnames=True), 1):>12.1f}"
+              f"{time_ms(lambda: parallel_fpgrowth(transactions, min_support=min_support, use_colnames=True, workers=1), repeats):>12.1f}"
+              f"{time_ms(lambda: eclat(transactions, min_support=min_support, use_colnames=True), repeats):>12.1f}")
+    print()
+
+
+
+# association_rules + filtering (as dataProcessing.py used to) vs. constrained_rules (see mining.py)
+# Rules must contain a review bin in their antecedents, optionally with a rule direction (as in the scatter graph filters)
+def benchmark_constrained_rules(game_count=15000, tag_count=120, min_support=0.0015):
+    games, themes, genres, reviews = synthetic_games(game_count, tag_count)
+    itemsets = eclat(games, min_support=min_support, use_colnames=True)
+
+    directions = {
+        'all': ({'antecedent_any': [reviews]}, None),
+        'themes>genres': ({'antecedent_any': [reviews, themes], 'consequent_any': [genres], 'consequent_none': themes}, (themes, genres)),
+        'genres>themes': ({'antecedent_any': [reviews, genres], 'consequent_any': [themes], 'consequent_none': genres}, (genres, themes)),
+    }
+
+    print(f"CONSTRAINED RULES: {len(itemsets)} itemsets (ms / peak MB)")
+    print(f"{'direction':<16}{'rules':>8}{'filter ms':>12}{'filter MB':>12}{'pushed ms':>12}{'pushed MB':>12}")
+
+    for name, (constraints, direction) in directions.items():
+        def filtered():
+            rules = association_rules(itemsets, metric="confidence", min_threshold=0.5)
+            rules = rules[rules.apply(lambda rule: len(set(rule['antecedents']) & reviews) > 0, axis=1)].reset_index(drop=True)
+            if direction:
+                antecedent_items, consequent_items = direction
+                keep = [bool(antecedents & antecedent_items) and not consequents & antecedent_items and bool(consequents & consequent_items)
+                        for antecedents, consequents in zip(rules['antecedents'], rules['consequents'])]
+                rules = rules[keep].reset_index(drop=True)
+            return rules
+
+        def pushed():
+            return constrained_rules(itemsets, min_confidence=0.5, **constraints)
+
+        expected = filtered()
+        assert pushed().equals(expected)
+
+        print(f"{name:<16}{len(expected):>8}" + ''.join(f"{ms:>12.1f}{mb:>12.2f}" for ms, mb in [time_and_peak_memory(filtered), time_and_peak_memory(pushed)]))
+    print()
+
+
+
+# Compares the original row-wise apply() of the derived review columns (dataProcessing.py) against append_new_columns()
+# total_reviews & percent_positive must match exactly - log_rating may differ by float rounding (math.log10 vs. np.log10)
+def benchmark_review_columns(game_count=200_000, seed=0):
+    rng = np.random.default_rng(seed)
+    games = pd.DataFrame({'positive': rng.integers(0, 5000, game_count), 'negative': rng.integers(0, 1000, game_count)})
+    games.loc[games.sample(frac=0.05, random_state=seed).index, 'positive'] = 0
+
+    def row_wise():
+        df = games.copy()
+        df['total_reviews'] = df.apply(lambda row: row['positive'] + row['negative'], axis=1)
+        df['percent_positive'] = df.apply(
+        lambda row: round((row['positive'] / (row['positive'] + row['negative']) * 100), 3)
+        if (row['positive']) > 0 else 0, axis=1)
+        df['log_rating'] = df.apply(lambda row: row['percent_positive'] - (row['percent_positive'] - 0.5) * 2 **(-math.log10(row['total_reviews'] + 50))
+        if (row['positive']) > 0 else 0, axis=1)
+        return df
+
+    expected = row_wise()
+    vectorized = append_new_columns(games)
+    assert np.array_equal(vectorized['total_reviews'].to_numpy(), expected['total_reviews'].to_numpy())
+    assert np.array_equal(vectorized['percent_positive'].to_numpy(), expected['percent_positive'].to_numpy())
+    assert np.allclose(vectorized['log_rating'].to_numpy(), expected['log_rating'].to_numpy(), rtol=0, atol=1e-9)
+
+    print(f"REVIEW COLUMNS: {game_count} games (ms)")
+    print(f"{'apply':>12}{'vectorized':>12}")
+    print(f"{time_ms(row_wise, 1):>12.1f}{time_ms(lambda: append_new_columns(games), 3):>12.1f}")
+    print()
+
+
+
+# Compares the per-game loop of the original heatmap (generateCombinations) against the matrix products of review_heatmap()
+def benchmark_heatmap(game_counts=(2000, 10000), tag_count=120):
+    print("HEATMAP (ms)")
+    print(f"{'games':>8}{'loop':>12}{'matrix':>12}")
+
+    for game_count in game_counts:
+        games, themes, genres, reviews = synthetic_games(game_count, tag_count)
+        names = pd.DataFrame({'appID': np.arange(game_count), 'name': [f"game {i}" for i in range(game_count)]})
+        df_themes = pd.concat([names, games[sorted(themes)]], axis=1)
+        df_genres = pd.concat([names, games[sorted(genres)]], axis=1)
+        scores = pd.Series(np.random.default_rng(0).uniform(0, 100, game_count).round(3))
+
+        def loop():
+            results = {}
+            theme_map = df_themes.set_index('appID').to_dict(orient='index')
+            genre_map = df_genres.set_index('appID').to_dict(orient='index')
+            for appID, score in zip(names['appID'], scores):
+                game_themes = [theme for theme, value in theme_map[appID].items() if value is True]
+                game_genres = [genre for genre, value in genre_map[appID].items() if value is True]
+                for theme in game_themes:
+                    for genre in game_genres:
+                        review_sum, occurrences = results.get((theme, genre), (0, 0))
+                        results[(theme, genre)] = (review_sum + score, occurrences + 1)
+            return results
+
+        expected = loop()
+        theme_names, genre_names, counts, review_sums = review_heatmap(df_themes, df_genres, scores)
+        for (theme, genre), (review_sum, occurrences) in expected.items():
+            assert counts[theme_names.index(theme), genre_names.index(genre)] == occurrences
+            assert np.isclose(review_sums[theme_names.index(theme), genre_names.index(genre)], review_sum)
+        assert counts.sum() == sum(occurrences for _, occurrences in expected.values())
+
+        print(f"{game_count:>8}{time_ms(loop, 1):>12.1f}{time_ms(lambda: review_heatmap(df_themes, df_genres, scores), 3):>12.1f}")
+    print()
+
+
+
+# Compares mining & generating rules for every grid point against the sweep in sweep.py (mine once at the lowest support,
+# then filter itemsets by support & rules by confidence) - the sweep must output the same itemsets & rules
+def benchmark_sweep(game_count=15000, tag_count=120, supports=(0.0015, 0.002, 0.003, 0.005), confidences=(0.5, 0.6, 0.7, 0.8)):
+    games, themes, genres, reviews = synthetic_games(game_count, tag_count)
+    constraints = {'antecedent_any': [reviews]}
+
+    # Method to return rules in a fixed order (rules generated from differently ordered itemsets are in a different order)
+    def sorted_rules(rules):
+        order = sorted(range(len(rules)), key=lambda i: (sorted(rules['antecedents'][i]), sorted(rules['consequents'][i])))
+        return rules.iloc[order].reset_index(drop=True)
+
+    def grid():
+        results = {}
+        for support in supports:
+            itemsets = mine_itemsets(games, support, engine='eclat')
+            for confidence in confidences:
+                results[(support, confidence)] = (itemsets, constrained_rules(itemsets, min_confidence=confidence, **constraints))
+        return results
+
+    def sweep():
+        results = {}
+        lowest = mine_itemsets(games, min(supports), engine='eclat')
+        for support in supports:
+            itemsets = filter_itemsets(lowest, support, len(games))
+            rules = constrained_rules(itemsets, min_confidence=min(confidences), **constraints)
+            for confidence in confidences:
+                results[(support, confidence)] = (itemsets, rules[rules['confidence'] >= confidence].reset_index(drop=True))
+        return results
+
+    expected = grid()
+    for point, (itemsets, rules) in sweep().items():
+        expected_itemsets, expected_rules = expected[point]
+        assert dict(zip(itemsets['itemsets'], itemsets['support'])) == dict(zip(expected_itemsets['itemsets'], expected_itemsets['support']))
+        assert sorted_rules(rules).equals(sorted_rules(expected_rules))
+
+    print(f"SWEEP: {len(supports)} supports x {len(confidences)} confidences (ms)")
+    print(f"{'grid':>12}{'sweep':>12}")
+    print(f"{time_ms(grid, 1):>12.1f}{time_ms(sweep, 1):>12.1f}")
+    print()
+
+
+
+# Method to return the RSS, PSS & USS (memory only used by this process) of a process in MB, read from /proc
+def process_memory(pid):
+    with open(f'/proc/{pid}/smaps_rollup') as file:
+        fields = {line.split(':')[0]: int(line.split()[1]) for line in file if line.endswith('kB\n')}
+    return fields['Rss'] / 1024, fields['Pss'] / 1024, (fields['Private_Clean'] + fields['Private_Dirty']) / 1024
+
+
+# Method to post a Dash callback request to a running app
+def post_callback(url, output, inputs):
+    body = {'output': f"{output[0]}.{output[1]}", 'outputs': {'id': output[0], 'property': output[1]},
+            'inputs': [{'id': id, 'property': property, 'value': value} for id, property, value in inputs],
+            'changedPropIds': [f"{inputs[0][0]}.{inputs[0][1]}"]}
+    request = urllib.request.Request(url + '/_dash-update-component', json.dumps(body).encode(), {'Content-Type': 'application/json'})
+    urllib.request.urlopen(request).read()
+
+
+# Per-worker memory of the app served by gunicorn, with & without preloading the app before forking workers (see gunicorn.conf.py)
+# Each worker is sent page & scatter callback requests first, so the memory measured is that of a worker in use
+def benchmark_worker_memory(worker_count=4, requests_per_worker=10):
+    print(f"WORKER MEMORY: {worker_count} gunicorn workers (MB per worker, averaged)")
+    print(f"{'preload':<10}{'rss':>10}{'pss':>10}{'uss':>10}{'total pss':>12}")
+
+    scatter_inputs = [('slider-occurrences', 'value', [0, 10**6]), ('slider-confidence', 'value', [0.5, 1.0]),
+                      ('slider-lift', 'value', [0, 71]), ('slider-review-score', 'value', [0, 100]),
+                      ('direction-filter', 'value', 'all'), ('dropdown-themes', 'value', None),
+                      ('dropdown-genres', 'value', None), ('scatter-plot', 'relayoutData', None)]
+
+    for preload in ['0', '1']:
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        url = f'http://127.0.0.1:{port}'
+
+        server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '--workers', str(worker_count), '--bind', f'127.0.0.1:{port}', 'app:server'],
+                                  env={**os.environ, 'PRELOAD_APP': preload}, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            for _ in range(600):
+                try:
+                    urllib.request.urlopen(url + '/startup-timings').read()
+                    break
+                except OSError:
+                    time.sleep(0.1)
+
+            for _ in range(worker_count * requests_per_worker):
+                post_callback(url, ('page-content', 'children'), [('url', 'pathname', '/')])
+                post_callback(url, ('scatter-plot', 'figure'), scatter_inputs)
+
+            with open(f'/proc/{server.pid}/task/{server.pid}/children') as file:
+                workers = [int(pid) for pid in file.read().split()]
+            memory = np.array([process_memory(pid) for pid in workers])
+        finally:
+            server.terminate()
+            server.wait()
+
+        rss, pss, uss = memory.mean(axis=0)
+        print(f"{'yes' if preload == '1' else 'no':<10}{rss:>10.1f}{pss:>10.1f}{uss:>10.1f}{memory[:, 1].sum():>12.1f}")
+    print()
+
+
+
+benchmarks = {
+    'review_columns': benchmark_review_columns,
+    'range_index': benchmark_range_index,
+    'payload': benchmark_payload,
+    'parallel_mining': benchmark_parallel_mining,
+    'eclat': benchmark_eclat,
+    'constrained_rules': benchmark_constrained_rules,
+    'heatmap': benchmark_heatmap,
+    'sweep': benchmark_sweep,
+    'worker_memory': benchmark_worker_memory,
+}
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or benchmarks:
+        benchmarks[name]()
@@ -1,66 +1,61 @@
 # Importing libraries
+import os
 import pandas as pd                 # For data structuring & manipulation
 import matplotlib.pyplot as plt     # For initial data visualisations (EDA)
-import math                         # For logarithmic calculations 
-import re                           # For regex statements
-from mlxtend.frequent_patterns import fpgrowth, association_rules # For association rule mining & itemset generation
+from mining import mine_itemsets, constrained_rules  # Itemset mining & rule generation engines (see mining.py)
 import plotly.express as px         # For heatmap visualisation
-import plotly.graph_objects as go   # For heatmap visualisation
+from preprocessing import load_games, append_new_columns, encode_tags, encode_review_bins, review_heatmap  # Preprocessing engines (see preprocessing.py)
+from artifacts import save_rules, save_item_vocabulary, save_heatmap, RULES_ARTIFACT, ITEM_VOCABULARY, HEATMAP_ARTIFACT  # For exporting the binary rules & heatmap artifacts & item vocabulary
+from artifacts import content_hash, run_stage  # For stage checkpoints
 
 
 
-# Loading the dataset into a Pandas DataFrame
-# using orient='index' since JSON data is structured as dictionary
-df = pd.read_json('games.json', orient='index')
-
-
-# Used for Exploratory Data Analysis
-#print(df.shape)                    # Number of rows/columns
-#print(df.head())                   # Previews 5 records
-#print(df.columns)                  # Prints all column names
-#print(df.isnull().sum())           # Prints number of missing values for each column
-
-
-# Method to append new columns to the DataFrame
-def append_new_columns():
-
-    # Total Reviews: Positive + Negative reviews
-    df['total_reviews'] = df.apply(lambda row: row['positive'] + row['negative'], axis=1)
-    
-    # Percent Positive: Positive / (Positive + Negative) * 100, returns a percentage
-    df['percent_positive'] = df.apply(
-    lambda row: round((row['positive'] / (row['positive'] + row['negative']) * 100), 3) # rounds percentage to 3 decimal places (e.g. 94.425%) 
-    if (row['positive']) > 0 else 0, axis=1) 
-
-    # Log Rating: Logarithmic weighting for percent_positive based on total_reviews.
-    # Note: 50 has been added to the total reviews for each game to accommodate smaller titles (possible emerging genres or newly-released games)
-    df['log_rating'] = df.apply(lambda row: row['percent_positive'] - (row['percent_positive'] - 0.5) * 2 **(-math.log10(row['total_reviews'] + 50))
-    if (row['positive']) > 0 else 0, axis=1)
-    
-
-append_new_columns()
+# ----------------------------------------------------------------------------------------------------------------
+# PIPELINE STAGES
+# The pipeline is split into named stages: load -> derive -> encode -> mine_itemsets -> generate_rules -> export
+# Each stage's result is checkpointed in /checkpoints, keyed by a hash of its inputs & parameters (see run_stage() in artifacts.py).
+# A rerun skips every stage whose inputs & parameters are unchanged - e.g. changing min_support only reruns mining, rules & export.
+# NOTE: keys include the contents of games.json, preprocessing.py & mining.py and the parameters below, but NOT this file.
+#       After editing a stage method below, rerun it with e.g. RERUN_STAGES=encode - every stage after a forced stage is
+#       also rerun (their keys are built from the forced stage's key, which doesn't change). RERUN_STAGES=all reruns every stage.
+# ----------------------------------------------------------------------------------------------------------------
 
+# Pipeline parameters
+games_source = 'games.json'
+include_info = False                # Set to True to keep the additional fields displayed by printGameInfo()
+min_total_reviews = 25              # Games with less total ratings are removed
+min_tag_votes = 0                   # Minimum number of user votes a tag needs to be kept for a game (0 keeps every tag)
+                                    # games.json stores tags as {"Tag": votes}, so this can be raised to ignore weakly-voted tags
+min_support = 0.0008                # Minimum support of 0.0008 is equal to 25 instances (total row count: 31752 * 0.0008 = 25.4)
+min_confidence = 0.5                # Only rules with a confidence of 50% or higher are generated
+rule_direction = None               # Optional rule direction: None (all rules), 'themes>genres' or 'genres>themes'
 
+# Itemset mining engine (see mining.py) - every engine outputs the same itemsets & supports as the fpgrowth() method (mlxtend library):
+# - 'fpgrowth':             fpgrowth() from mlxtend
+# - 'parallel_fpgrowth':    mines each item's partition of the FP-tree in parallel
+# - 'eclat':                vertical mining using packed bit vectors of each item (fastest on df_final)
+# As the output is identical, the engine & number of workers are not part of the mining stage's key
+# NOTE: on df_final-sized data the process pool of parallel_fpgrowth costs more than it saves ('py benchmark.py parallel_mining')
+mining_engine = 'eclat'
 
-# Removing rows with less than 25 total ratings
-print("Removing all games with less than 25 ratings")
-df = df[df['total_reviews'] > 24]
-print(df.shape)
+# Number of processes used by parallel_fpgrowth (None uses every CPU core, 1 mines without a process pool)
+mining_workers = 1
 
+# Stages to rerun regardless of their checkpoint (comma separated stage names, or 'all') - stages after them are rerun too
+rerun_stages = os.environ.get('RERUN_STAGES', '').split(',')
 
-# Displaying 40 rows with highest logarithmic review score
-#print(df.nlargest(40, 'log_rating')[['name', 'percent_positive', 'log_rating']])
+# Set once a stage has been forced to rerun, so every stage after it is also rerun (see stage() below)
+forced_rerun = False
 
-# Viewing summary statistics of log_rating column
-#print(df['log_rating'].describe())
+# Files written by the export stage
+exported_files = ['rules.csv', RULES_ARTIFACT, 'df_genres.csv', 'df_themes.csv', 'df_reviews.csv', ITEM_VOCABULARY, HEATMAP_ARTIFACT]
 
 
 
-# Test appID to display game information of specific columns
-appID = 632470
 
 # Method to print out column information of chosen record using its unique appID
-def printGameInfo():
+# Test appID to display game information of specific columns: 632470
+def printGameInfo(df, appID=632470):
     print("Game: ", df.loc[appID]['name'])
     print("Positive ratings: ", df.loc[appID]['positive'])
     print("Negative ratings: ", df.loc[appID]['negative'])
@@ -73,8 +68,6 @@ def printGameInfo():
     print("% Positive ratings ratings: ", df.loc[appID]['percent_positive'])
     print("LOGARITHMIC RATING: ", df.loc[appID]['log_rating'])
 
-#printGameInfo()
-
 
 
 
@@ -335,156 +328,236 @@ World War II""")
 
 
 
-# Reformatting original DataFrame's tags from dictionary format to string using regex
-# Example: "Casual": 49, "Arcade": 47, becomes "Casual, Arcade",
-def processTags(tag):
+# Reformatting original DataFrame's tags from dictionary format to a list of tag names
+# Example: {"Casual": 49, "Arcade": 47} becomes ["Casual", "Arcade"]
+# Tags are read directly from the dictionary keys (or list elements), so names containing apostrophes such as
+# "Beat 'em up" and "Shoot 'Em Up" are kept intact
+def processTags(tag, min_votes=0):
 
     if isinstance(tag, dict):
-        tag = str(tag)
+        return [name for name, votes in tag.items() if votes >= min_votes]
 
-    tagList = re.findall(r"'([^']+)'", tag)
-    return tagList
+    if isinstance(tag, (list, tuple)):
+        return [name for name in tag if isinstance(name, str)]
 
-# Applying reformatting method to df['tags'] column
-df['tags'] = df['tags'].apply(lambda x: processTags(x) if isinstance(x, (str, dict)) else [])
+    return []
 
 
+# Assigning review bin thresholds and labels
+bins = [0, 5, 10, 15, 20, 25, 30, 35, 40, 45, 50, 55, 60, 65, 70, 75, 80, 85, 90, 95, 100]
 
-# Creating appID column using DataFrame index (index is appID by default - just unnamed)
-df['appID'] = df.index
+bin_labels = ['0-5', '5-10', '10-15', '15-20', '20-25', '25-30', '30-35', '35-40', '40-45', 
+            '45-50', '50-55', '55-60', '60-65', '65-70', '70-75', '75-80', '80-85', '85-90', '90-95', '95-100']
 
-# Creating two new DataFrames of genres and themes - both containing the appID & name field
-df_genres = df[['appID', 'name']].copy()
-df_themes = df[['appID', 'name']].copy()
 
 
 
-# This method will append new columns onto the DataFrames for each theme & genre within their respective list.
-# For each appID (game), if a tag is present its column will be set to True - else False
-def oneHotEncoding():
-    for theme in themeList:
-        df_themes[theme] = df['tags'].apply(lambda tags: True if theme in tags else False)
 
+# STAGE 1: LOAD
+# Loading the dataset into a Pandas DataFrame
+# games.json is streamed one appID at a time and only the fields used below are kept (see preprocessing.py)
+def load_stage():
+    df = pd.concat(load_games(games_source, chunk_size=5000, include_info=include_info))
 
-    for genre in genreList:
-        df_genres[genre] = df['tags'].apply(lambda tags: True if genre in tags else False)
+    # Used for Exploratory Data Analysis
+    #print(df.shape)                    # Number of rows/columns
+    #print(df.head())                   # Previews 5 records
+    #print(df.columns)                  # Prints all column names
+    #print(df.isnull().sum())           # Prints number of missing values for each column
 
-oneHotEncoding()
+    return df
 
 
 
+# STAGE 2: DERIVE
+# Appending total_reviews, percent_positive & log_rating columns to the DataFrame (see preprocessing.py),
+# removing games with too few ratings & reformatting tags into lists of tag names
+def derive_stage(df):
+    df = append_new_columns(df)
 
-# One-hot-encoding logarithmic review score number into categorical review bins - populating df_reviews
+    # Removing rows with less than 25 total ratings
+    print(f"Removing all games with less than {min_total_reviews} ratings")
+    df = df[df['total_reviews'] >= min_total_reviews].copy()
+    print(df.shape)
 
-# Assigning bin thresholds and labels
-bins = [0, 5, 10, 15, 20, 25, 30, 35, 40, 45, 50, 55, 60, 65, 70, 75, 80, 85, 90, 95, 100]
+    # Displaying 40 rows with highest logarithmic review score
+    #print(df.nlargest(40, 'log_rating')[['name', 'percent_positive', 'log_rating']])
 
-bin_labels = ['0-5', '5-10', '10-15', '15-20', '20-25', '25-30', '30-35', '35-40', '40-45', 
-            '45-50', '50-55', '55-60', '60-65', '65-70', '70-75', '75-80', '80-85', '85-90', '90-95', '95-100']
+    # Viewing summary statistics of log_rating column
+    #print(df['log_rating'].describe())
 
-# Creating a new column 'review_bin' with custom bins list
-# pd.cut() will categorize the log rating value into an appropriate bin
-# right=True & include_lowest=True match the format of bin labels
-df['review_bin'] = pd.cut(df['log_rating'], bins=bins, labels=bin_labels, include_lowest=True, right=True)
+    #printGameInfo(df)
 
-# Using get_dummies to create additional columns for every bin in 'review_bin'
-# This will one-hot-encode df['log_rating'] into a binary value for its corresponding review bin 
-df_reviews = pd.get_dummies(df[['appID', 'name', 'review_bin']], columns=['review_bin'])
+    # Applying reformatting method to df['tags'] column
+    df['tags'] = df['tags'].apply(lambda x: processTags(x, min_tag_votes))
 
+    # Creating appID column using DataFrame index (index is appID by default - just unnamed)
+    df['appID'] = df.index
+    return df
 
 
 
+# STAGE 3: ENCODE
+# One-hot-encoding genres, themes & review bins - returns df, df_genres, df_themes, df_reviews & df_final
+def encode_stage(df):
 
-# Final DataFrame processing before association rule mining
-# df_final will contain one-hot-encoded values for themes, genres, & review bin - required for association rule mining
+    # Creating two new DataFrames of genres and themes - both containing the appID & name field
+    # For each appID (game), a column is appended for each theme & genre within their respective list.
+    # If a tag is present its column will be set to True - else False (see encode_tags() in preprocessing.py)
+    df_genres = encode_tags(df, genreList)
+    df_themes = encode_tags(df, themeList)
 
-# 1. df_tags is created, combining the results of one-hot-encoded df_themes & df_genres
-df_tags = pd.concat([df_genres, df_themes], axis=1)
 
-# 2. df_final is created, combining df_reviews with df_tags (created in step 1)
-df_final = pd.concat([df_tags, df_reviews], axis=1)
+    # One-hot-encoding logarithmic review score number into categorical review bins - populating df_reviews
 
-# 3. The appID and name columns are dropped as they won't be included in association rule mining
-df_final = df_final.drop(columns=['appID', 'name'])
+    # Creating a new column 'review_bin' with custom bins list
+    # pd.cut() will categorize the log rating value into an appropriate bin
+    # right=True & include_lowest=True match the format of bin labels
+    df = df.assign(review_bin=pd.cut(df['log_rating'], bins=bins, labels=bin_labels, include_lowest=True, right=True))
 
+    # Creating additional columns for every bin in 'review_bin' (same layout as pd.get_dummies, e.g. review_bin_80-85)
+    # This will one-hot-encode df['log_rating'] into a binary value for its corresponding review bin 
+    df_reviews = encode_review_bins(df, bin_labels)
 
 
+    # Final DataFrame processing before association rule mining
+    # df_final will contain one-hot-encoded values for themes, genres, & review bin - required for association rule mining
 
+    # 1. df_tags is created, combining the results of one-hot-encoded df_themes & df_genres
+    df_tags = pd.concat([df_genres, df_themes], axis=1)
 
+    # 2. df_final is created, combining df_reviews with df_tags (created in step 1)
+    df_final = pd.concat([df_tags, df_reviews], axis=1)
 
-# Generating itemsets for association rule mining using fpgrowth() method (mlxtend library)
-print("Generating itemsets...")
+    # 3. The appID and name columns are dropped as they won't be included in association rule mining
+    df_final = df_final.drop(columns=['appID', 'name'])
 
-# Minimum support of 0.0008 is equal to 25 instances
-# total row count: 31752 * 0.008 = 25.4 (rounded down)
-itemsets = fpgrowth(df_final, min_support=0.0008, use_colnames=True)
+    return df, df_genres, df_themes, df_reviews, df_final
 
-print("Generated itemsets.")
 
 
+# STAGE 4: MINE ITEMSETS
+# Generating itemsets for association rule mining (see mining.py)
+def mine_stage(df_final, support=min_support):
+    print("Generating itemsets...")
+    itemsets = mine_itemsets(df_final, min_support=support, engine=mining_engine, workers=mining_workers)
+    print("Generated itemsets.")
+    return itemsets
 
 
-# Generating association rules using itemsets & association_growth*() method (mlxtend library)
-print("Generating association rules...")
 
-# Creates a new DataFrame containing association rules
-# metric="confidence", min_threshold=0.5 only adds rules with a confidence of 50% or higher
-rules = association_rules(itemsets, metric="confidence", min_threshold=0.5)
+# Method to return the rule constraints passed to constrained_rules() for a rule direction (see mining.py)
+# Only rules containing at least 1 review bin in their antecedents are generated
+# (the same rules as association_rules() from the mlxtend library, followed by a filter on the antecedents - but rules that
+# would be filtered out are never enumerated). The rule direction is applied during generation in the same way.
+# e.g. 'themes>genres' only generates rules with a theme in the antecedents & only genres (no themes) in the consequents
+def rule_constraints(df_genres, df_themes, df_reviews, direction):
 
-print("Generated association rules.")
+    # Creating 3 sets for themes, genres and reviews
+    # This allows each rule's antecedent and consequent to be checked for the presence of themes, genres & reviews
+    genres = set(df_genres.columns)
+    themes = set(df_themes.columns)
+    reviews = set(df_reviews.columns)
 
+    if direction == 'themes>genres':
+        return {'antecedent_any': [reviews, themes], 'consequent_any': [genres], 'consequent_none': themes}
+    if direction == 'genres>themes':
+        return {'antecedent_any': [reviews, genres], 'consequent_any': [themes], 'consequent_none': genres}
+    return {'antecedent_any': [reviews]}
 
 
 
-# Creating two columns to build a strings out of each rule's antecedents and consequents
-# By default antecedents and consequents are frozenstrings - this converts them into strings
-rules['antecedents_str'] = rules['antecedents'].apply(lambda x: ', '.join(sorted(list(x))))
-rules['consequents_str'] = rules['consequents'].apply(lambda x: ', '.join(sorted(list(x))))
+# STAGE 5: GENERATE RULES
+# Generating association rules using itemsets & constrained_rules() (see mining.py)
+def rules_stage(itemsets, constraints, confidence=min_confidence):
+    print("Generating association rules...")
 
+    # Creates a new DataFrame containing association rules
+    rules = constrained_rules(itemsets, min_confidence=confidence, **constraints)
 
-# Creating 3 sets for themes, genres and reviews to determine length
-# This allows each rule's antecedent and consequent to be checked for the presence of themes, genres & reviews
-genres = set(df_genres.columns)
-themes = set(df_themes.columns)
-reviews = set(df_reviews.columns)
+    # Creating two columns to build a strings out of each rule's antecedents and consequents
+    # By default antecedents and consequents are frozenstrings - this converts them into strings
+    rules['antecedents_str'] = rules['antecedents'].apply(lambda x: ', '.join(sorted(list(x))))
+    rules['consequents_str'] = rules['consequents'].apply(lambda x: ', '.join(sorted(list(x))))
 
+    print("Generated association rules.")
+    return rules
 
-def contains_review(rule):
-    
-    # Creating sets of the antecedents and consequents
-    antecedents = set(rule['antecedents'])
-    consequents = set(rule['consequents'])
 
 
-    #theme_count_antecedent = len(antecedents & themes)
-    #genre_count_antecedent = len(antecedents & genres)
-    review_count_antecedent = len(antecedents & reviews)
+# STAGE 6: EXPORT
+# Exporting DataFrames to .csv
+# rules are also exported to a binary artifact (rules.npz) which is loaded by visualise.py without string parsing
+# NOTE: visualise.py only reads the item vocabulary manifest (items.csv) - the df_*.csv files are kept for analysis
+def export_stage(df, df_genres, df_themes, df_reviews, rules):
+    rules.to_csv('rules.csv', index=False)
+    save_rules(rules, RULES_ARTIFACT)
+    df_genres.to_csv('df_genres.csv', index=False)
+    df_themes.to_csv('df_themes.csv', index=False)
+    df_reviews.to_csv('df_reviews.csv', index=False)
 
-    #theme_count_consequent = len(consequents & themes)
-    #genre_count_consequent = len(consequents & genres)
-    #review_count_consequent = len(consequents & reviews)
-    
+    # Exporting the item vocabulary (every genre, theme & review bin) to a small manifest loaded by visualise.py (see artifacts.py)
+    save_item_vocabulary({
+        'genre': df_genres.columns.drop(['appID', 'name']),
+        'theme': df_themes.columns.drop(['appID', 'name']),
+        'review': df_reviews.columns.drop(['appID', 'name'])
+    })
 
-    # Custom filters determining length of theme/review/genres
-    # For example, the below if statement allows filtering of exact numbers of theme/genre/review in antecedent or consequent:
-    #if theme_count_antecedent == 1 and genre_count_antecedent == 1 and review_count_consequent == 1:
-    if review_count_antecedent > 0:
-        return True
-    return False
+    # THEME x GENRE HEATMAP
+    # For every theme & genre combination: the number of games and the sum of their (unprocessed) raw review scores
+    # Calculated with matrix products over the one-hot theme & genre DataFrames (see review_heatmap() in preprocessing.py)
+    # rather than looping over every game & every combination - pages/heatmap.py then displays the averages from heatmap.npz
+    heatmap_themes, heatmap_genres, heatmap_counts, percent_sums = review_heatmap(df_themes, df_genres, df['percent_positive'])
+    log_sums = review_heatmap(df_themes, df_genres, df['log_rating'])[3]
+    save_heatmap(heatmap_themes, heatmap_genres, heatmap_counts, {'percent_positive': percent_sums, 'log_rating': log_sums}, HEATMAP_ARTIFACT)
 
+    return exported_files
 
-# Applying rule filtering to return only rules containing at least 1 review in antecedent
-rules = rules[rules.apply(contains_review, axis=1)].reset_index(drop=True)
 
 
+# Method to run a stage through its checkpoint (see run_stage() in artifacts.py)
+# A forced stage's key is unchanged, so the stages after it would otherwise load their checkpoints built from its old result
+def stage(name, key, function, outputs=()):
+    global forced_rerun
+    forced_rerun = forced_rerun or 'all' in rerun_stages or name in rerun_stages
+    return run_stage(name, key, function, outputs, rerun=forced_rerun)
+
+
+# Method to return the path of a source file in this directory (the stage keys include the code of the modules they use)
+def source(name):
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+
+
+# Method to run the load, derive & encode stages - returns the encode stage's key & result
+# Each key includes the key of the stage before it, so a change to an earlier stage also reruns every stage after it
+# NOTE: hashing games.json reads the whole file (~1s), which is far quicker than parsing it again
+def prepare():
+    key = content_hash([games_source, source('preprocessing.py')], include_info)
+    df = stage('load', key, load_stage)
+
+    key = content_hash([source('preprocessing.py')], key, min_total_reviews, min_tag_votes)
+    df = stage('derive', key, lambda: derive_stage(df))
+
+    key = content_hash([source('preprocessing.py')], key, genreList, themeList, bins, bin_labels)
+    return key, stage('encode', key, lambda: encode_stage(df))
+
 
 
 
-# Exporting DataFrames to .csv
-rules.to_csv('rules.csv', index=False)
-df_genres.to_csv('df_genres.csv', index=False)
-df_themes.to_csv('df_themes.csv', index=False)
-df_reviews.to_csv('df_reviews.csv', index=False)
+
+# NOTE: the pipeline only runs when this file is run directly (py dataProcessing.py), so the stages & settings above can be
+# imported without running it (see sweep.py). This also keeps the process pool used by parallel_fpgrowth safe to start.
+if __name__ == "__main__":
+    key, (df, df_genres, df_themes, df_reviews, df_final) = prepare()
+
+    key = content_hash([source('mining.py')], key, min_support)
+    itemsets = stage('mine_itemsets', key, lambda: mine_stage(df_final))
+
+    key = content_hash([source('mining.py')], key, min_confidence, rule_direction)
+    rules = stage('generate_rules', key, lambda: rules_stage(itemsets, rule_constraints(df_genres, df_themes, df_reviews, rule_direction)))
+
+    key = content_hash([source('artifacts.py'), source('preprocessing.py')], key)
+    stage('export', key, lambda: export_stage(df, df_genres, df_themes, df_reviews, rules), outputs=exported_files)
 
 
 
@@ -511,100 +584,3 @@ df_reviews.to_csv('df_reviews.csv', index=False)
 # )
 
 # fig.show()
-
-
-
-
-# NOTE: DEPRECATED FEATURE
-# generateCombinations() creates a heatmap visualisation based on the (unprocessed) raw average review scores for each game
-# All combinations of theme & genre are generated which are then given values based on the average review score of ALL games containing those themes/genres
-def generateCombinations():
-    
-    # Generating combinations of all themes/genres
-    combinations = [(theme, genre) for theme in themeList for genre in genreList]
-
-    # Initializing variables to store results
-    results = {}
-    df_average_list = []
-
-    # Changing orientation of DataFrames to dictionary for processing
-    appID_genre_map = df_genres.set_index('appID').to_dict(orient='index')
-    appID_theme_map = df_themes.set_index('appID').to_dict(orient='index')
-
-    
-    # Iterates over every existing record in dataset
-    for appID in df['appID']:
-        
-        genres = {genre for genre, value in appID_genre_map.get(appID, {}).items() if value is True}
-        themes = {theme for theme, value in appID_theme_map.get(appID, {}).items() if value is True}
-
-
-        # Calculating the sum of review scores and amount of occurrences (for division to get average)
-        rating_sum = df[df['appID'] == appID]['percent_positive'].sum()
-
-        for theme, genre in combinations:
-            if theme in themes and genre in genres:
-                if (theme, genre) not in results:
-                    results[(theme, genre)] = {'review_sum': 0, 'occurrences': 0}
-
-                # Increments review sum & occurrences if a combination is found
-                results[(theme, genre)]['review_sum'] += rating_sum
-                results[(theme, genre)]['occurrences'] += 1
-
-    # Calculating average review score based on occurrences
-    for (theme, genre), data in results.items():
-        review_average = data['review_sum'] / data['occurrences'] if data['occurrences'] > 0 else 0
-        df_average_list.append({
-            'theme': theme,
-            'genre': genre,
-            'review_average': round(review_average,2),
-            'occurrences': data['occurrences']
-        })
-
-    
-    # Creating df_vis for visulisation - needs to be reshaped to a pivot table
-    df_vis = pd.DataFrame(df_average_list)
-    pivot_df = df_vis[df_vis['occurrences'] > 10].pivot(index='genre', columns='theme', values='review_average')
-
-
-    # Filtering occurrences to a minimum of 10 (so that averages aren't skewed by low occurrences)
-    df_vis_filtered = df_vis[df_vis['occurrences'] > 10]
-
-    # Re-pivoting table on genre index to display on heatmap
-    pivot_df = df_vis_filtered.pivot(index='genre', columns='theme', values='review_average')
-    
-    
-    # Specifying parameters for hover data to show on mouse-hover
-    hoverdata = df_vis_filtered.pivot(index='genre', columns='theme', values='occurrences')
-    hoverdata = hoverdata.fillna(0).round(0).astype(int)
-    hoverdata_str = hoverdata.applymap(str)
-
-    # Sorting heatmap values by highest average review score
-    sorted_index = pivot_df.mean(axis=1).sort_values(ascending=True).index
-    pivot_df = pivot_df.loc[sorted_index]
-    hoverdata_str = hoverdata_str.loc[sorted_index]
-
-    # Generating heatmap using themes, genres, and review count as parameters
-    # Additional hover data has been included
-    fig = go.Figure(go.Heatmap(
-        x=pivot_df.columns,  
-        y=pivot_df.index,   
-        z=pivot_df.values,  
-        hovertemplate=
-        '<b>Theme: %{x}</b><br>' +
-        'Genre: %{y}<br>' +
-        'Average Review Score: %{z}%<br>' +
-        'Occurrences: %{text}<br>',
-        text=hoverdata_str.values,
-        colorscale='rainbow'
-    ))
-
-    
-    # Setting graph titles & user functionality
-    fig.update_layout(title="Heatmap of Review Averages", width=1800, height=1800)
-    fig.update_layout(dragmode="pan")
-    fig.update_layout(transition={"duration": 0})
-    fig.show(config={"scrollZoom": True})
-
-
-#generateCombinations()
\ No newline at end of file
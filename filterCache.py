@@ -0,0 +1,146 @@
+# Importing libraries
+import os
+import json
+import sqlite3                      # For the shared on-disk cache (shared between gunicorn workers)
+import tempfile
+import threading
+from collections import OrderedDict # For the in-process LRU cache
+import numpy as np
+
+
+
+# FILTER RESULT CACHE
+# Memoizes the rule indices selected by filter_scatter() in app.py, keyed on the normalized callback inputs.
+# - Each worker keeps a small in-process LRU cache (OrderedDict) for the fastest lookups
+# - Results are also stored in a SQLite file so every gunicorn worker on the same machine shares them
+# Both caches evict the least recently used entries once their results take up more than CACHE_BYTES in total.
+# Results are stored in a compact form (see _compact() below), and results larger than CACHE_ENTRY_BYTES are not cached.
+CACHE_BYTES = int(os.environ.get('FILTER_CACHE_BYTES', 32 << 20))
+CACHE_ENTRY_BYTES = CACHE_BYTES // 16
+CACHE_PATH = os.environ.get('FILTER_CACHE_PATH', os.path.join(tempfile.gettempdir(), 'honours_filter_cache.sqlite'))
+
+# Hit/miss counters for this worker (exposed by the /cache-stats endpoint in app.py)
+stats = {'hits': 0, 'shared_hits': 0, 'misses': 0, 'not_cached': 0}
+
+_local = OrderedDict()
+_local_bytes = 0
+_lock = threading.Lock()
+_connection = None
+_connection_pid = None
+
+
+
+# Method to build a normalized cache key from the callback inputs
+# Slider values are converted to floats, selections are sorted & empty selections are treated the same as None,
+# so equivalent inputs always produce the same key. namespace should identify the loaded rules (e.g. a content hash).
+def make_key(namespace, ranges, direction_filter, theme_selection, genre_selection):
+    return json.dumps([
+        namespace,
+        [[float(value) for value in values] for values in ranges],
+        direction_filter or 'all',
+        sorted(theme_selection or []),
+        sorted(genre_selection or [])
+    ])
+
+
+# Method to open the shared SQLite cache (once per process, since connections cannot be shared across forked workers)
+# Returns None if the cache file cannot be used, in which case only the in-process cache is used
+def _shared():
+    global _connection, _connection_pid
+
+    if _connection_pid != os.getpid():
+        _connection_pid = os.getpid()
+        try:
+            _connection = sqlite3.connect(CACHE_PATH, timeout=1, isolation_level=None, check_same_thread=False)
+            _connection.execute("PRAGMA journal_mode=WAL")
+            _connection.execute("PRAGMA synchronous=OFF")
+            _connection.execute("CREATE TABLE IF NOT EXISTS filter_results (key TEXT PRIMARY KEY, form TEXT, rows BLOB, last_used REAL)")
+        except sqlite3.Error:
+            _connection = None
+
+    return _connection
+
+
+# Method to return the compact form of rule indices as a (form, array) pair: 'int32' indices, or a 'bitmap' of one bit per rule
+# (up to the largest index) when that is smaller - e.g. every one of 1M rules is a 125KB bitmap rather than 8MB of int64 indices
+# NOTE: bitmaps are only used for sorted indices without duplicates (the order of the rows is not stored)
+def _compact(rows):
+    if len(rows) and len(rows) * 4 > rows[-1] // 8 + 1 and np.all(np.diff(rows) > 0):
+        present = np.zeros(rows[-1] + 1, dtype=bool)
+        present[rows] = True
+        return 'bitmap', np.packbits(present)
+    return 'int32', rows.astype(np.int32)
+
+
+# Method to return the rule indices (int64) of a compact (form, array) pair
+def _expand(form, data):
+    if form == 'bitmap':
+        return np.flatnonzero(np.unpackbits(data))
+    return data.astype(np.int64)
+
+
+# Method to add a compact result to the in-process LRU cache, evicting the least recently used entries while over CACHE_BYTES
+def _remember(key, entry):
+    global _local_bytes
+    if key in _local:
+        _local_bytes -= _local.pop(key)[1].nbytes
+    _local[key] = entry
+    _local_bytes += entry[1].nbytes
+    while _local_bytes > CACHE_BYTES:
+        _local_bytes -= _local.popitem(last=False)[1][1].nbytes
+
+
+# Method to return the cached rule indices for a key, or None on a cache miss
+def get(key):
+    with _lock:
+        if key in _local:
+            _local.move_to_end(key)
+            stats['hits'] += 1
+            return _expand(*_local[key])
+
+        connection = _shared()
+        if connection is not None:
+            try:
+                row = connection.execute("SELECT form, rows FROM filter_results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    connection.execute("UPDATE filter_results SET last_used = julianday('now') WHERE key = ?", (key,))
+                    entry = (row[0], np.frombuffer(row[1], dtype=np.uint8 if row[0] == 'bitmap' else np.int32))
+                    _remember(key, entry)
+                    stats['shared_hits'] += 1
+                    return _expand(*entry)
+            except sqlite3.Error:
+                pass
+
+        stats['misses'] += 1
+        return None
+
+
+# Method to store the rule indices for a key in both caches (unless their compact form is larger than CACHE_ENTRY_BYTES)
+def put(key, rows):
+    entry = _compact(np.asarray(rows, dtype=np.int64))
+    if entry[1].nbytes > CACHE_ENTRY_BYTES:
+        stats['not_cached'] += 1
+        return
+
+    with _lock:
+        _remember(key, entry)
+
+        connection = _shared()
+        if connection is not None:
+            try:
+                connection.execute("INSERT OR REPLACE INTO filter_results VALUES (?, ?, ?, julianday('now'))", (key, entry[0], entry[1].tobytes()))
+                # Evicting the least recently used results once the results stored before them exceed CACHE_BYTES
+                connection.execute("DELETE FROM filter_results WHERE key IN (SELECT key FROM "
+                                   "(SELECT key, SUM(length(rows)) OVER (ORDER BY last_used DESC, key) AS total FROM filter_results) "
+                                   "WHERE total > ?)", (CACHE_BYTES,))
+            except sqlite3.Error:
+                pass
+
+
+# Method to return cached rule indices for a key, computing & storing them with compute() on a cache miss
+def cached(key, compute):
+    rows = get(key)
+    if rows is None:
+        rows = compute()
+        put(key, rows)
+    return rows
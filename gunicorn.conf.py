@@ -0,0 +1,17 @@
+# Gunicorn settings (loaded automatically when running 'gunicorn app:server' from this directory, see Procfile)
+# The number of workers is set by the WEB_CONCURRENCY environment variable (gunicorn's default)
+import gc
+import os
+
+
+# Importing the app once in the master process before the workers are forked (set PRELOAD_APP=0 to disable)
+# The rules, indexes & figure prepared in visualise.py are then shared between every worker (copy-on-write),
+# rather than each worker preparing & holding its own copy. See rule_arrays in visualise.py.
+preload_app = os.environ.get('PRELOAD_APP', '1') == '1'
+
+
+# Moving every object created while preloading into a permanent generation that the garbage collector never scans
+# Otherwise the first garbage collection in each worker writes to (and therefore copies) the pages of every shared object
+def pre_fork(server, worker):
+    if preload_app:
+        gc.freeze()
@@ -0,0 +1,305 @@
+# Importing libraries
+import math
+import os
+import collections
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np                  # For packed bit vectors
+import pandas as pd                 # For data structuring & manipulation
+from mlxtend.frequent_patterns import fpgrowth, fpcommon    # FP-tree used by mlxtend's fpgrowth()
+from mlxtend.frequent_patterns.fpgrowth import fpg_step
+
+
+
+# PARALLEL FP-GROWTH
+# mlxtend's fpgrowth() builds one FP-tree of every game, outputs each frequent item, then mines the conditional tree of
+# each frequent item one after another. Those conditional trees are independent of each other - each one is built from
+# the item's conditional pattern base (the paths from the root of the tree to every node of that item, with their counts).
+# parallel_fpgrowth() builds the FP-tree once, splits it into one partition per frequent item (its conditional pattern base),
+# and mines the partitions within a process pool. Results are merged in the same order as fpgrowth(), so the output
+# DataFrame is identical to fpgrowth(df, min_support, use_colnames=...) - same itemsets, supports, row order & index.
+# NOTE: like dataProcessing.py, the input must be a one-hot DataFrame without null values
+
+
+
+# Method to mine a single partition: the itemsets ending with item, given the item's conditional pattern base
+# Mirrors FPTree.conditional_tree() in mlxtend, then runs the same recursive step as fpgrowth()
+def _mine_partition(partition):
+    item, pattern_base, minsup, max_len = partition
+
+    count = collections.defaultdict(int)
+    for branch, branch_count in pattern_base:
+        for branch_item in branch:
+            count[branch_item] += branch_count
+
+    items = [branch_item for branch_item in count if count[branch_item] >= minsup]
+    items.sort(key=count.get)
+    rank = {branch_item: i for i, branch_item in enumerate(items)}
+
+    cond_tree = fpcommon.FPTree(rank)
+    for branch, branch_count in pattern_base:
+        cond_tree.insert_itemset(sorted([i for i in branch if i in rank], key=rank.get, reverse=True), branch_count)
+    cond_tree.cond_items = [item]
+
+    return list(fpg_step(cond_tree, minsup, None, max_len, 0))
+
+
+# Method to return the multiprocessing context used for the process pool
+# Workers are forked so they don't re-run the script that called parallel_fpgrowth() - where fork is unavailable
+# (e.g. Windows), None is returned and the partitions are mined one after another instead
+def _pool_context():
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return None
+
+
+# Method to return frequent itemsets of a one-hot DataFrame, in the same format as mlxtend's fpgrowth()
+# workers: number of processes to mine partitions with (None uses every CPU core, 1 mines within this process)
+def parallel_fpgrowth(df, min_support=0.5, use_colnames=False, max_len=None, workers=None):
+    fpcommon.valid_input_check(df)
+    if min_support <= 0.0:
+        raise ValueError(f"`min_support` must be a positive number within the interval `(0, 1]`. Got {min_support}.")
+
+    num_itemsets = len(df.index)
+    tree, _, _ = fpcommon.setup_fptree(df, min_support)
+    minsup = math.ceil(min_support * num_itemsets)      # min support as count
+
+    items = list(tree.nodes.keys())
+    if tree.is_path():
+        # A single path has no partitions to mine - every itemset is generated directly from the path
+        results = list(fpg_step(tree, minsup, None, max_len, 0))
+    else:
+        # Frequent items (in the same order as fpgrowth), followed by each partition in that order
+        results = [(sum(node.count for node in tree.nodes[item]), [item]) for item in items]
+
+        partitions = [(item, [(node.itempath_from_root(), node.count) for node in tree.nodes[item]], minsup, max_len)
+                      for item in items]
+
+        context = _pool_context()
+        workers = workers or os.cpu_count()
+        if workers > 1 and context is not None and len(partitions) > 1:
+            # Largest partitions are submitted first so that a single large partition doesn't finish last
+            by_size = sorted(range(len(partitions)), key=lambda i: -sum(count for _, count in partitions[i][1]))
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                mined = dict(zip(by_size, pool.map(_mine_partition, [partitions[i] for i in by_size])))
+            partition_results = [mined[i] for i in range(len(partitions))]
+        else:
+            partition_results = [_mine_partition(partition) for partition in partitions]
+
+        for partition_result in partition_results:
+            results.extend(partition_result)
+
+    # Support = count / number of games (as the input has no null values, this matches the support computed by fpgrowth)
+    res_df = pd.DataFrame({'support': [support / num_itemsets for support, _ in results],
+                           'itemsets': [frozenset(itemset) for _, itemset in results]})
+    res_df = res_df[res_df['support'] >= min_support]
+
+    if use_colnames:
+        colname_map = dict(enumerate(df.columns))
+        res_df['itemsets'] = res_df['itemsets'].apply(lambda x: frozenset([colname_map[i] for i in x]))
+
+    return res_df
+
+
+
+# VERTICAL BITSET MINING (ECLAT)
+# df_final is narrow & dense (a few hundred items over tens of thousands of games), which suits vertical mining:
+# each item is stored as a packed bit vector over every game (one bit per game, 64 games per uint64 word), so the games
+# containing an itemset are the AND of its items' bit vectors, and its support is a popcount of the result.
+# Itemsets are extended depth-first - every extension of the same prefix is ANDed & counted in a single NumPy operation.
+# eclat() returns the same itemsets & supports as fpgrowth() (in a different row order), so its output can be passed
+# straight to association_rules().
+
+
+# Method to return the number of set bits within each row of a 2D array of uint64 words
+def _popcount(words):
+    return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+
+
+# Method to pack each column of a 2D boolean array (games x items) into a bit vector of uint64 words (items x words)
+def _vertical_bitsets(values):
+    packed = np.packbits(values, axis=0)
+    packed = np.pad(packed, ((0, -packed.shape[0] % 8), (0, 0)))
+    return np.ascontiguousarray(packed.T).view(np.uint64)
+
+
+# Method to add every frequent itemset starting with prefix to results, given the frequent extensions of prefix
+# items, bitsets & counts line up: each extension item, the bit vector of prefix + item, and its count
+def _eclat_step(prefix, items, bitsets, counts, minsup, max_len, results):
+    for i in range(len(items)):
+        itemset = prefix + [int(items[i])]
+        results.append((int(counts[i]), itemset))
+
+        if (max_len and len(itemset) >= max_len) or i + 1 == len(items):
+            continue
+
+        joined = bitsets[i + 1:] & bitsets[i]
+        joined_counts = _popcount(joined)
+        frequent = joined_counts >= minsup
+        if frequent.any():
+            _eclat_step(itemset, items[i + 1:][frequent], joined[frequent], joined_counts[frequent], minsup, max_len, results)
+
+
+# Method to return frequent itemsets of a one-hot DataFrame, in the same format as mlxtend's fpgrowth()
+def eclat(df, min_support=0.5, use_colnames=False, max_len=None):
+    fpcommon.valid_input_check(df)
+    if min_support <= 0.0:
+        raise ValueError(f"`min_support` must be a positive number within the interval `(0, 1]`. Got {min_support}.")
+
+    num_itemsets = len(df.index)
+    minsup = math.ceil(min_support * num_itemsets)      # min support as count
+
+    bitsets = _vertical_bitsets(df.to_numpy(dtype=bool))
+    counts = _popcount(bitsets)
+
+    # Frequent items, in order of increasing support (so the bit vectors being ANDed shrink as quickly as possible)
+    items = np.flatnonzero(counts >= minsup)
+    items = items[np.argsort(counts[items], kind='stable')]
+
+    results = []
+    _eclat_step([], items, bitsets[items], counts[items], minsup, max_len, results)
+
+    res_df = pd.DataFrame({'support': [support / num_itemsets for support, _ in results],
+                           'itemsets': [frozenset(itemset) for _, itemset in results]})
+    res_df = res_df[res_df['support'] >= min_support]
+
+    if use_colnames:
+        colname_map = dict(enumerate(df.columns))
+        res_df['itemsets'] = res_df['itemsets'].apply(lambda x: frozenset([colname_map[i] for i in x]))
+
+    return res_df
+
+
+
+# Itemset mining engines selectable within dataProcessing.py
+MINING_ENGINES = ['fpgrowth', 'parallel_fpgrowth', 'eclat']
+
+
+# Method to return frequent itemsets (with column names) using the chosen mining engine
+# workers is only used by parallel_fpgrowth
+def mine_itemsets(df, min_support, engine='eclat', workers=1):
+    if engine == 'fpgrowth':
+        return fpgrowth(df, min_support=min_support, use_colnames=True)
+    if engine == 'parallel_fpgrowth':
+        return parallel_fpgrowth(df, min_support=min_support, use_colnames=True, workers=workers)
+    if engine == 'eclat':
+        return eclat(df, min_support=min_support, use_colnames=True)
+    raise ValueError(f"Unknown mining engine: {engine} (expected one of {MINING_ENGINES})")
+
+
+# Method to return the itemsets of a higher min_support from itemsets mined at a lower minimum support (see sweep.py)
+# Applies the same checks as the engines above (support count >= ceil(min_support * n) & support >= min_support), so the
+# result contains the same itemsets & supports as mining again at min_support
+def filter_itemsets(itemsets, min_support, transaction_count):
+    counts = np.rint(itemsets['support'].to_numpy() * transaction_count)
+    frequent = (counts >= math.ceil(min_support * transaction_count)) & (itemsets['support'].to_numpy() >= min_support)
+    return itemsets[frequent].reset_index(drop=True)
+
+
+
+# CONSTRAINED RULE GENERATION
+# association_rules() (mlxtend library) generates a rule for every split of every frequent itemset, most of which are then
+# discarded by dataProcessing.py (e.g. rules without a review bin in their antecedents). constrained_rules() pushes those
+# constraints into rule generation instead - itemsets that can never produce a valid rule are skipped, items that must be
+# in the antecedents are fixed there, and only the remaining splits are enumerated. Constraints are given as sets of items:
+# - antecedent_any:     the antecedents must contain at least one item of EACH set (e.g. [review bins])
+# - consequent_any:     the consequents must contain at least one item of EACH set (e.g. [genres])
+# - consequent_none:    the consequents must not contain any of these items (e.g. themes)
+# The output is identical to association_rules(itemsets, metric='confidence', min_threshold=min_confidence) followed by
+# the same filter (same rules, metrics, row order & a 0..n-1 index).
+RULE_METRICS = ['antecedent support', 'consequent support', 'support', 'confidence', 'lift', 'representativity',
+                'leverage', 'conviction', 'zhangs_metric', 'jaccard', 'certainty', 'kulczynski']
+
+
+# Method to return the positions (within members) of every valid antecedent of an itemset, in association_rules() order
+# Returns an empty list if no split of the itemset can satisfy the constraints
+def _constrained_antecedents(members, antecedent_any, consequent_any, consequent_none):
+    positions = {item: i for i, item in enumerate(members)}
+
+    # Items that can't be in the consequents must be in the antecedents, as must the only item of an antecedent_any set
+    required = {positions[item] for item in members if item in consequent_none}
+    antecedent_groups = []
+    for items in antecedent_any:
+        group = {positions[item] for item in members if item in items}
+        if not group:
+            return []
+        if len(group) == 1:
+            required |= group
+        else:
+            antecedent_groups.append(group)
+
+    consequent_groups = []
+    for items in consequent_any:
+        group = {positions[item] for item in members if item in items} - required
+        if not group:
+            return []
+        consequent_groups.append(group)
+
+    free = [i for i in range(len(members)) if i not in required]
+    antecedents = []
+
+    # Antecedent sizes are enumerated largest first (like association_rules), each size in combinations() order
+    for size in range(len(members) - 1, max(len(required), 1) - 1, -1):
+        candidates = []
+        for chosen in itertools.combinations(free, size - len(required)):
+            antecedent = required.union(chosen)
+            if all(group & antecedent for group in antecedent_groups) and all(group - antecedent for group in consequent_groups):
+                candidates.append(tuple(sorted(antecedent)))
+        antecedents.extend(sorted(candidates))
+
+    return antecedents
+
+
+# Method to generate association rules with a minimum confidence from frequent itemsets, applying the constraints above
+def constrained_rules(itemsets, min_confidence=0.8, antecedent_any=(), consequent_any=(), consequent_none=()):
+    supports = dict(zip(itemsets['itemsets'], itemsets['support']))
+    consequent_none = set(consequent_none)
+
+    rule_antecedents = []
+    rule_consequents = []
+    rule_supports = []
+
+    for itemset, sAC in supports.items():
+        # Skipping itemsets without an item from every antecedent_any set (no split of these can ever be valid)
+        if len(itemset) < 2 or any(itemset.isdisjoint(items) for items in antecedent_any):
+            continue
+
+        members = list(itemset)
+        for positions in _constrained_antecedents(members, antecedent_any, consequent_any, consequent_none):
+            antecedent = frozenset(members[i] for i in positions)
+            consequent = itemset.difference(antecedent)
+
+            sA = supports[antecedent]
+            if sAC / sA >= min_confidence:
+                rule_antecedents.append(antecedent)
+                rule_consequents.append(consequent)
+                rule_supports.append([sAC, sA, supports[consequent]])
+
+    sAC, sA, sC = np.array(rule_supports, dtype=float).reshape(-1, 3).T
+
+    # Metrics are calculated with the same formulas (and order of operations) as association_rules()
+    confidence = sAC / sA
+    leverage = sAC - sA * sC
+    with np.errstate(divide='ignore', invalid='ignore'):
+        conviction = np.full(confidence.shape, np.inf)
+        conviction[confidence < 1.0] = (1.0 - sC[confidence < 1.0]) / (1.0 - confidence[confidence < 1.0])
+
+        zhangs_denominator = np.maximum(sAC * (1 - sA), sA * (sC - sAC))
+        zhangs_metric = np.where(zhangs_denominator == 0, 0, leverage / zhangs_denominator)
+        certainty = np.where(1 - sC == 0, 0, (confidence - sC) / (1 - sC))
+
+    rules = pd.DataFrame(data=list(zip(rule_antecedents, rule_consequents)), columns=['antecedents', 'consequents'])
+    rules['antecedent support'] = sA
+    rules['consequent support'] = sC
+    rules['support'] = sAC
+    rules['confidence'] = confidence
+    rules['lift'] = confidence / sC
+    rules['representativity'] = np.ones(len(rules))
+    rules['leverage'] = leverage
+    rules['conviction'] = conviction
+    rules['zhangs_metric'] = zhangs_metric
+    rules['jaccard'] = sAC / (sA + sC - sAC)
+    rules['certainty'] = certainty
+    rules['kulczynski'] = (confidence + sAC / sC) / 2
+    return rules
@@ -0,0 +1,105 @@
+from dash import html
+from dash import dcc
+from functools import lru_cache
+import os
+import numpy as np
+import plotly.graph_objects as go
+from artifacts import load_heatmap, HEATMAP_ARTIFACT
+
+
+# Loading the precomputed theme x genre heatmap written by dataProcessing.py (see review_heatmap() in preprocessing.py)
+heatmap = load_heatmap(HEATMAP_ARTIFACT) if os.path.exists(HEATMAP_ARTIFACT) else None
+
+# Minimum number of games for a theme & genre combination to be displayed (so that averages aren't skewed by low occurrences)
+min_occurrences = 10
+
+# Labels of each review score that can be displayed on the heatmap
+score_labels = {'percent_positive': 'Positive Review %', 'log_rating': 'Logarithmic Review Score'}
+
+
+
+# Building the heatmap figure for a review score - each figure is only built the first time it is requested
+# (see update_heatmap() in app.py), and reused afterwards
+@lru_cache(maxsize=None)
+def get_figure(score):
+    themes, genres, counts, review_sums = heatmap
+
+    # Only including combinations with more than min_occurrences games (and themes/genres with at least one such combination)
+    shown = counts > min_occurrences
+    theme_columns = sorted(np.flatnonzero(shown.any(axis=1)), key=lambda i: themes[i])
+    genre_rows = sorted(np.flatnonzero(shown.any(axis=0)), key=lambda i: genres[i])
+
+    # Calculating average review score based on occurrences (genres as rows, themes as columns)
+    averages = np.where(shown, review_sums[score] / np.maximum(counts, 1), np.nan).round(2).T[np.ix_(genre_rows, theme_columns)]
+    occurrences = np.where(shown, counts, 0).T[np.ix_(genre_rows, theme_columns)]
+
+    # Sorting heatmap rows by highest average review score
+    with np.errstate(all='ignore'):
+        sorted_rows = np.argsort(np.nanmean(averages, axis=1), kind='stable')
+
+    # Generating heatmap using themes, genres, and review count as parameters
+    # Additional hover data has been included
+    fig = go.Figure(go.Heatmap(
+        x=[themes[i] for i in theme_columns],
+        y=[genres[genre_rows[i]] for i in sorted_rows],
+        z=averages[sorted_rows],
+        hovertemplate=
+        '<b>Theme: %{x}</b><br>' +
+        'Genre: %{y}<br>' +
+        'Average Review Score: %{z}%<br>' +
+        'Occurrences: %{text}<br>',
+        text=occurrences[sorted_rows].astype(str),
+        colorscale='rainbow'
+    ))
+
+    # Setting graph titles & user functionality
+    fig.update_layout(title=f"Heatmap of Review Averages ({score_labels.get(score, score)})", height=1800)
+    fig.update_layout(dragmode="pan")
+    fig.update_layout(transition={"duration": 0})
+    return fig
+
+
+
+# The page layout is only built the first time '/heatmap' is requested (see display_page() in app.py), and reused afterwards
+@lru_cache(maxsize=1)
+def get_layout():
+
+    if heatmap is None:
+        return html.Div([
+            html.H2("Steam Games Theme & Genre Heatmap", style={'textAlign': 'center'}),
+            html.P(f"{HEATMAP_ARTIFACT} was not found - run dataProcessing.py to generate it.", style={'textAlign': 'center'})
+        ])
+
+    scores = list(heatmap[3])
+
+    return html.Div([
+
+        # Page Header
+        html.H2("Steam Games Theme & Genre Heatmap",
+                style={'textAlign': 'center'}),
+
+        # Review score selection (updates the heatmap using update_heatmap() callback in app.py)
+        html.Div([
+            dcc.RadioItems(
+                id='heatmap-score',
+                options=[{'label': score_labels.get(score, score), 'value': score} for score in scores],
+                value=scores[0],
+                inline=True
+            )
+        ], style={'backgroundColor': 'rgba(255, 255, 250, 0.8)',
+                  'borderRadius': '30px',
+                  'padding': '5px',
+                  'margin-left': '5%',
+                  'margin-right': '5%',
+                  'textAlign': 'center'}),
+
+        # Heatmap (displays the average review score of games for every theme & genre combination)
+        dcc.Graph(id='heatmap',
+                  figure=get_figure(scores[0]),
+                  config={
+                      "scrollZoom": True,
+                      "displayModeBar": False
+                  },
+                  style={'margin-left': '5%',
+                         'margin-right': '5%'})
+    ])
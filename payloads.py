@@ -0,0 +1,63 @@
+# Importing libraries
+import base64
+import numpy as np
+
+
+
+# BINARY TRACE PAYLOADS
+# Plotly (v6+) accepts numeric trace arrays as base64-encoded typed arrays: {'dtype': 'f8', 'bdata': '...', 'shape': 'rows, columns'}
+# These are much smaller & faster to serialize than JSON lists of numbers, so callbacks in app.py send numeric arrays in this form.
+
+# Method to encode a numeric array as a Plotly typed array (dtype can be used to downcast, e.g. 'f4' or 'i4')
+def typed_array(values, dtype=None):
+    values = np.ascontiguousarray(values, dtype=dtype)
+    spec = {
+        'dtype': values.dtype.str.lstrip('<|='),
+        'bdata': base64.b64encode(values.tobytes()).decode('ascii')
+    }
+    if values.ndim > 1:
+        spec['shape'] = ', '.join(str(size) for size in values.shape)
+    return spec
+
+
+
+# LEVEL-OF-DETAIL AGGREGATION
+# When too many rules are visible to plot individually, points are binned into a grid over the visible window instead.
+# Each occupied bin is sent as a single point at its centre, with the number of rules & the max (or mean) lift within it.
+
+# Method to return the visible [low, high] range of an axis from a graph's relayoutData (or default if not zoomed/panned)
+def visible_range(relayout_data, axis, default):
+    relayout_data = relayout_data or {}
+
+    if relayout_data.get(axis + '.autorange'):
+        return default
+    if axis + '.range' in relayout_data:
+        return tuple(relayout_data[axis + '.range'])
+    if axis + '.range[0]' in relayout_data and axis + '.range[1]' in relayout_data:
+        return relayout_data[axis + '.range[0]'], relayout_data[axis + '.range[1]']
+    return default
+
+
+# Method to bin points (already within x_range & y_range) into a bins[0] x bins[1] grid
+# Returns the x & y centres of every occupied bin, the max/mean of values within each bin, and the number of points in each bin
+def aggregate_points(x, y, values, x_range, y_range, bins=(100, 60), statistic='max'):
+    (x_low, x_high), (y_low, y_high) = x_range, y_range
+    x_width = (x_high - x_low) / bins[0] or 1
+    y_width = (y_high - y_low) / bins[1] or 1
+
+    x_bin = np.clip(((np.asarray(x) - x_low) / x_width).astype(np.int64), 0, bins[0] - 1)
+    y_bin = np.clip(((np.asarray(y) - y_low) / y_width).astype(np.int64), 0, bins[1] - 1)
+    flat_bin = x_bin * bins[1] + y_bin
+
+    counts = np.bincount(flat_bin, minlength=bins[0] * bins[1])
+    if statistic == 'max':
+        binned_values = np.full(bins[0] * bins[1], -np.inf)
+        np.maximum.at(binned_values, flat_bin, values)
+    else:
+        binned_values = np.bincount(flat_bin, weights=values, minlength=bins[0] * bins[1]) / np.maximum(counts, 1)
+
+    occupied = np.flatnonzero(counts)
+    return (x_low + (occupied // bins[1] + 0.5) * x_width,
+            y_low + (occupied % bins[1] + 0.5) * y_width,
+            binned_values[occupied],
+            counts[occupied])
@@ -0,0 +1,165 @@
+# Importing libraries
+import json                         # For incremental JSON decoding
+import numpy as np                  # For vectorized column calculations
+import pandas as pd                 # For data structuring & manipulation
+
+
+
+# Fields from games.json used by the pipeline (everything else is discarded while streaming)
+PIPELINE_FIELDS = ['name', 'positive', 'negative', 'tags']
+
+# Additional fields displayed by printGameInfo() in dataProcessing.py
+INFO_FIELDS = ['score_rank', 'average_playtime_forever', 'average_playtime_2weeks',
+               'median_playtime_forever', 'median_playtime_2weeks', 'peak_ccu']
+
+
+
+# Method to skip whitespace (and optionally commas) within the buffer, returning the new position
+def _skip(buffer, pos, chars=' \t\r\n'):
+    while pos < len(buffer) and buffer[pos] in chars:
+        pos += 1
+    return pos
+
+
+
+# Streaming loader for games.json
+# The file is one top-level dictionary of {appID: {game record}}, so records are decoded one appID at a time
+# using json.JSONDecoder.raw_decode() over a rolling text buffer, instead of loading the whole file at once.
+# Only the selected fields of each record are kept, and records are yielded as DataFrames of at most chunk_size rows
+# (indexed by appID) - this means peak memory depends on chunk_size rather than the size of games.json.
+def load_games(path='games.json', chunk_size=5000, include_info=False, block_size=1 << 20):
+    fields = PIPELINE_FIELDS + (INFO_FIELDS if include_info else [])
+    decoder = json.JSONDecoder()
+
+    with open(path, 'r', encoding='utf-8') as file:
+        buffer = file.read(block_size)
+        eof = not buffer
+
+        # Skipping opening brace of the top-level dictionary
+        pos = _skip(buffer, 0)
+        if pos >= len(buffer) or buffer[pos] != '{':
+            raise ValueError(f"{path} does not contain a top-level JSON object")
+        pos += 1
+
+        records = {}
+        while True:
+            pos = _skip(buffer, pos, ' \t\r\n,')
+
+            if pos < len(buffer) and buffer[pos] == '}':
+                break
+
+            # Attempting to decode the next "appID": {record} pair from the buffer
+            try:
+                if pos >= len(buffer):
+                    raise json.JSONDecodeError("Buffer exhausted", buffer, pos)
+                appID, end = decoder.raw_decode(buffer, pos)
+                end = _skip(buffer, end)
+                if end >= len(buffer) or buffer[end] != ':':
+                    raise json.JSONDecodeError("Expecting ':' delimiter", buffer, end)
+                record, end = decoder.raw_decode(buffer, _skip(buffer, end + 1))
+
+            # Record is split across the end of the buffer - read the next block and retry from the same record
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                block = file.read(block_size)
+                eof = not block
+                buffer = buffer[pos:] + block
+                pos = 0
+                continue
+
+            records[int(appID)] = {field: record.get(field) for field in fields}
+            pos = end
+
+            if len(records) >= chunk_size:
+                yield pd.DataFrame.from_dict(records, orient='index', columns=fields)
+                records = {}
+
+            # Discarding consumed text so the buffer never grows past one block plus one record
+            if pos > block_size:
+                buffer = buffer[pos:]
+                pos = 0
+
+        if records:
+            yield pd.DataFrame.from_dict(records, orient='index', columns=fields)
+
+
+
+# Method to append derived review columns to a DataFrame of games, returning a new DataFrame
+# Each column is computed as a whole-column NumPy operation rather than one Python call per game.
+def append_new_columns(df):
+    positive = df['positive'].to_numpy(dtype=float)
+    negative = df['negative'].to_numpy(dtype=float)
+    total = positive + negative
+    has_positive = positive > 0
+
+    # Total Reviews: Positive + Negative reviews
+    total_reviews = df['positive'] + df['negative']
+
+    # Percent Positive: Positive / (Positive + Negative) * 100, returns a percentage
+    # rounds percentage to 3 decimal places (e.g. 94.425%), games without positive reviews are set to 0
+    # NOTE: the divisor is replaced with 1 for those games so no division by zero is evaluated
+    percent_positive = np.where(has_positive, np.round(positive / np.where(has_positive, total, 1) * 100, 3), 0.0)
+
+    # Log Rating: Logarithmic weighting for percent_positive based on total_reviews.
+    # Note: 50 has been added to the total reviews for each game to accommodate smaller titles (possible emerging genres or newly-released games)
+    log_rating = np.where(has_positive, percent_positive - (percent_positive - 0.5) * 2 ** (-np.log10(total + 50)), 0.0)
+
+    return df.assign(total_reviews=total_reviews, percent_positive=percent_positive, log_rating=log_rating)
+
+
+
+# One-hot encoding engine for themes, genres & review bins
+# The tag -> column index is built once, then every game's tags are visited in a single pass to fill a boolean matrix
+# (instead of scanning every game's tag list once per theme/genre).
+def one_hot_encode(tag_lists, vocabulary):
+    column_index = {tag: i for i, tag in enumerate(vocabulary)}
+    rows = []
+    columns = []
+
+    for row, tags in enumerate(tag_lists):
+        for tag in tags:
+            column = column_index.get(tag)
+            if column is not None:
+                rows.append(row)
+                columns.append(column)
+
+    matrix = np.zeros((len(tag_lists), len(vocabulary)), dtype=bool)
+    matrix[rows, columns] = True
+    return matrix
+
+
+# Method to build a one-hot DataFrame of tags (df_genres/df_themes layout): appID, name, then one column per vocabulary item
+def encode_tags(df, vocabulary):
+    matrix = one_hot_encode(df['tags'].tolist(), vocabulary)
+    return pd.concat([df[['appID', 'name']], pd.DataFrame(matrix, index=df.index, columns=vocabulary)], axis=1)
+
+
+# Method to build a one-hot DataFrame of review bins (df_reviews layout): appID, name, then review_bin_<label> columns
+# Uses the categorical codes from pd.cut() directly, so no tag lookup is required
+def encode_review_bins(df, bin_labels):
+    codes = df['review_bin'].cat.codes.to_numpy()
+    matrix = np.zeros((len(df), len(bin_labels)), dtype=bool)
+    matrix[np.flatnonzero(codes >= 0), codes[codes >= 0]] = True
+
+    columns = ['review_bin_' + label for label in bin_labels]
+    return pd.concat([df[['appID', 'name']], pd.DataFrame(matrix, index=df.index, columns=columns)], axis=1)
+
+
+
+# THEME x GENRE REVIEW HEATMAP
+# For every theme & genre combination: the number of games tagged with both, and the sum of those games' review scores.
+# With one-hot matrices T (games x themes) & G (games x genres) and a review score per game w, these are the matrix products
+# counts = T.T @ G & review sums = T.T @ (G * w) - instead of a loop over every game & every theme/genre combination.
+# df_themes & df_genres use the layout of encode_tags(), and scores must share their index (e.g. df['percent_positive']).
+def review_heatmap(df_themes, df_genres, scores):
+    themes = df_themes.drop(columns=['appID', 'name'])
+    genres = df_genres.drop(columns=['appID', 'name'])
+
+    theme_matrix = themes.to_numpy(dtype=np.float64)
+    genre_matrix = genres.to_numpy(dtype=np.float64)
+    weights = scores.reindex(df_themes.index).to_numpy(dtype=np.float64)
+
+    counts = (theme_matrix.T @ genre_matrix).round().astype(np.int64)
+    review_sums = theme_matrix.T @ (genre_matrix * weights[:, None])
+    return list(themes.columns), list(genres.columns), counts, review_sums
@@ -0,0 +1,140 @@
+# Importing libraries
+import numpy as np                  # For vectorized bitwise operations
+
+
+
+# BITMASK ITEM ENCODING
+# Every item (theme, genre or review bin) is given a bit position, and each rule's antecedents & consequents are stored
+# as fixed-width bitmasks made of uint64 words (one row per rule). Checking whether a rule contains a set of items
+# then becomes a bitwise AND over NumPy arrays, rather than a Python set operation per rule.
+
+# Method to assign a bit position to every item
+def build_item_index(items):
+    return {item: bit for bit, item in enumerate(sorted(items))}
+
+
+# Method to return the number of uint64 words required to store one bit per item
+def word_count(item_index):
+    return max(1, (len(item_index) + 63) // 64)
+
+
+# Method to build a single bitmask (1D array of words) from a collection of items
+# Items that are not in the index are ignored
+def items_mask(items, item_index):
+    mask = np.zeros(word_count(item_index), dtype=np.uint64)
+    for item in items or []:
+        bit = item_index.get(item)
+        if bit is not None:
+            mask[bit // 64] |= np.uint64(1) << np.uint64(bit % 64)
+    return mask
+
+
+# Method to encode a column of itemsets (e.g. rules['antecedents']) into a 2D array of bitmasks
+def encode_masks(itemsets, item_index):
+    rows = []
+    bits = []
+    for row, itemset in enumerate(itemsets):
+        for item in itemset:
+            rows.append(row)
+            bits.append(item_index[item])
+
+    rows = np.array(rows, dtype=np.int64)
+    bits = np.array(bits, dtype=np.int64)
+
+    masks = np.zeros((len(itemsets), word_count(item_index)), dtype=np.uint64)
+    np.bitwise_or.at(masks, (rows, bits // 64), np.left_shift(np.uint64(1), (bits % 64).astype(np.uint64)))
+    return masks
+
+
+# Returns a boolean array: True for each rule whose bitmask contains ANY item within the mask
+def contains_any(masks, mask):
+    return (masks & mask).any(axis=1)
+
+
+
+# RANGE INDEX
+# Each slider column (occurrences, confidence, lift, review score) is stored alongside a sorted copy of its values.
+# A range query uses searchsorted() to find the matching span within every sorted column, starts from the most selective
+# column, and only checks the remaining columns for those candidate rows - so narrow slider ranges no longer scan every rule.
+
+# Method to build the range index for the given columns of a DataFrame
+def build_range_index(df, columns):
+    index = {}
+    for column in columns:
+        values = df[column].to_numpy()
+        order = np.argsort(values, kind='stable')
+        index[column] = (values, order, values[order])
+    return index
+
+
+# Method to return the (sorted) row positions whose values fall within every inclusive (low, high) range in bounds
+# e.g. bounds={'lift': (2, 10), 'confidence': (0.5, 0.8)}
+# If even the most selective column matches more than scan_fraction of all rows, a plain boolean scan is cheaper.
+def range_query(index, bounds, scan_fraction=0.25):
+    spans = {}
+    for column, (low, high) in bounds.items():
+        sorted_values = index[column][2]
+        spans[column] = (np.searchsorted(sorted_values, low, side='left'),
+                         np.searchsorted(sorted_values, high, side='right'))
+
+    column = min(spans, key=lambda c: spans[c][1] - spans[c][0])
+    start, end = spans[column]
+    row_count = len(index[column][0])
+
+    if end - start > row_count * scan_fraction:
+        matches = np.ones(row_count, dtype=bool)
+        for other, (low, high) in bounds.items():
+            values = index[other][0]
+            matches &= (values >= low) & (values <= high)
+        return np.flatnonzero(matches)
+
+    return range_filter(index, bounds, np.sort(index[column][1][start:end]))
+
+
+# Method to return only the given (sorted) row positions whose values fall within every range in bounds
+def range_filter(index, bounds, rows):
+    for column, (low, high) in bounds.items():
+        values = index[column][0][rows]
+        rows = rows[(values >= low) & (values <= high)]
+    return rows
+
+
+
+# INVERTED INDEX
+# Maps each item to a sorted array of the rule IDs (row positions) containing it - one index is built for antecedents
+# and another for consequents. Selecting items then intersects their posting lists, starting from the shortest,
+# so the cost depends on how many rules contain the selected items rather than on the total number of rules.
+
+# Method to build an inverted index from a 2D array of rule bitmasks (see encode_masks)
+def build_inverted_index(masks, item_index):
+    postings = {}
+    for item, bit in item_index.items():
+        word = masks[:, bit // 64]
+        postings[item] = np.flatnonzero(word & (np.uint64(1) << np.uint64(bit % 64))).astype(np.int64)
+    return postings
+
+
+# Method to intersect two sorted arrays of row positions (None represents every row)
+# Each row of the shorter array is looked up within the longer array using a binary search
+def intersect_rows(rows, other):
+    if rows is None:
+        return other
+    if other is None:
+        return rows
+    if len(rows) > len(other):
+        rows, other = other, rows
+
+    positions = np.searchsorted(other, rows).clip(max=max(len(other) - 1, 0))
+    return rows[other[positions] == rows] if len(other) else other
+
+
+# Method to return the sorted rows containing ALL of the given items (None if no items are given)
+def rows_containing_all(postings, items):
+    if not items:
+        return None
+
+    empty = np.empty(0, dtype=np.int64)
+    rows = None
+    for posting in sorted((postings.get(item, empty) for item in items), key=len):
+        rows = intersect_rows(rows, posting)
+    return rows
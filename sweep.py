@@ -0,0 +1,81 @@
+# Parameter sweep over minimum support & minimum confidence
+# Usage: py sweep.py                                  (sweeps the default supports & confidences below)
+#        py sweep.py 0.0008,0.001,0.002 0.5,0.6,0.7   (comma separated supports, then comma separated confidences)
+# Itemsets are mined once at the lowest support: the itemsets of every higher support are filtered from those
+# (see filter_itemsets() in mining.py), and the rules of every confidence are filtered from the rules generated at the lowest
+# confidence. Each combination is saved as a rules artifact in /sweep (e.g. sweep/rules_s0.001_c0.6.npz, which can be loaded
+# by copying it over rules.npz), along with a summary table of rule counts & timings (sweep/summary.csv).
+# NOTE: the load, derive & encode stages use the same checkpoints as dataProcessing.py (see PIPELINE STAGES)
+
+# Importing libraries
+import os
+import sys
+import time
+import pandas as pd                 # For data structuring & manipulation
+from mining import filter_itemsets
+from artifacts import content_hash, save_rules
+from dataProcessing import prepare, stage, source, mine_stage, rules_stage, rule_constraints, rule_direction, min_support, min_confidence
+
+
+SWEEP_DIR = 'sweep'
+
+# Default grid of minimum supports & minimum confidences
+supports = [min_support, 0.001, 0.0015, 0.002]
+confidences = [min_confidence, 0.6, 0.7, 0.8]
+
+
+# Method to return the time (in milliseconds) since start
+def elapsed_ms(start):
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+# Method to run the sweep - returns the summary table (one row per support & confidence combination)
+def sweep(supports, confidences, directory=SWEEP_DIR):
+    supports = sorted(set(supports))
+    confidences = sorted(set(confidences))
+    key, (df, df_genres, df_themes, df_reviews, df_final) = prepare()
+    constraints = rule_constraints(df_genres, df_themes, df_reviews, rule_direction)
+
+    # Mining itemsets once, at the lowest support (checkpointed separately from dataProcessing.py's mine_itemsets stage)
+    start = time.perf_counter()
+    key = content_hash([source('mining.py')], key, supports[0])
+    itemsets = stage('sweep_itemsets', key, lambda: mine_stage(df_final, supports[0]))
+    mine_ms = elapsed_ms(start)
+
+    os.makedirs(directory, exist_ok=True)
+    summary = []
+    for support in supports:
+        start = time.perf_counter()
+        support_itemsets = filter_itemsets(itemsets, support, len(df_final))
+        filter_ms = elapsed_ms(start)
+
+        # Generating rules once per support, at the lowest confidence
+        start = time.perf_counter()
+        rules = rules_stage(support_itemsets, constraints, confidences[0])
+        rules_ms = elapsed_ms(start)
+
+        for confidence in confidences:
+            start = time.perf_counter()
+            confidence_rules = rules[rules['confidence'] >= confidence].reset_index(drop=True)
+            path = os.path.join(directory, f"rules_s{support}_c{confidence}.npz")
+            save_rules(confidence_rules, path)
+
+            summary.append({'min_support': support, 'min_confidence': confidence, 'itemsets': len(support_itemsets),
+                            'rules': len(confidence_rules), 'mine_ms': mine_ms, 'filter_ms': filter_ms, 'rules_ms': rules_ms,
+                            'save_ms': elapsed_ms(start), 'artifact': path})
+
+    summary = pd.DataFrame(summary)
+    summary.to_csv(os.path.join(directory, 'summary.csv'), index=False)
+    return summary
+
+
+
+# NOTE: mine_ms is the time taken to mine (or load the checkpointed) itemsets once for the whole sweep,
+#       rules_ms is the time taken to generate the rules of each support once for every confidence
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        supports = [float(value) for value in sys.argv[1].split(',')]
+    if len(sys.argv) > 2:
+        confidences = [float(value) for value in sys.argv[2].split(',')]
+
+    print(sweep(supports, confidences).drop(columns=['artifact']).to_string(index=False))
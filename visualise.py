@@ -1,19 +1,40 @@
 # Importing libraries
 import pandas as pd                 # For data structuring & manipulation
+import numpy as np
 import plotly.express as px
 import plotly.colors as pc
+import plotly.graph_objects as go
 import ast
 import re
+import os
+import time
+from artifacts import load_rules, load_item_vocabulary, pack_strings, RULES_ARTIFACT, ITEM_VOCABULARY, content_hash, load_snapshot, save_snapshot
+from ruleIndex import build_item_index, encode_masks, items_mask, build_range_index, build_inverted_index
 
-# Loading in .csv files for visualisation
-df_genres = pd.read_csv('df_genres.csv')
-df_themes = pd.read_csv('df_themes.csv')
-df_reviews = pd.read_csv('df_reviews.csv')
-rules = pd.read_csv('rules.csv')
 
-# Creating new column: Occurrences
-# This is because the results of the support metric were too difficult to interpret
-rules["occurrences"] = (rules["support"] * 31752).round() - 1
+# STARTUP TIMING
+# The time taken (in milliseconds) by each phase of preparing the rules & figure below, in order.
+# Each phase is printed to the server log as it finishes, and all phases are exposed by the /startup-timings endpoint in app.py
+startup_timings = {}
+_phase_start = time.perf_counter()
+
+# Method to record the time since the previous phase finished (or since this module started loading)
+def record_phase(name):
+    global _phase_start
+    now = time.perf_counter()
+    startup_timings[name] = round((now - _phase_start) * 1000, 1)
+    print(f"Startup: {name} took {startup_timings[name]} ms (pid {os.getpid()})", flush=True)
+    _phase_start = now
+
+
+
+# Method to reformat review score using regex statement
+# FROM: review_score_bin_80-85      TO: Review Score: 80-85
+def reformat_review_score(antecedent):
+    match = re.match(r'review_bin_(\d+-\d+)', antecedent)
+    if match:
+        return f"Review Score: {match.group(1)}"    # Reformatting if antecedent contains review score
+    return antecedent
 
 
 
@@ -22,117 +43,295 @@ rules["occurrences"] = (rules["support"] * 31752).round() - 1
 def remove_frozen_string(string):
     return frozenset(ast.literal_eval(string.replace("frozenset(", "").replace(")", "")))
 
-rules['antecedents'] = rules['antecedents'].apply(remove_frozen_string)
-rules['consequents'] = rules['consequents'].apply(remove_frozen_string)
 
 
+# Using regex statement to extract upper and lower values from a review bin item
+# For example: review_bin_80-85 will return two integers: 80, 85
+def get_review_bin_range(item):
+    match = re.match(r'review_bin_(\d+)-(\d+)', item)
+    if match:
+        return int(match.group(1)), int(match.group(2))
+    return None
 
-# Initialising sets for themes & genres to import later in app.py & scatter.py
-genres = set(df_genres.columns)
-themes = set(df_themes.columns)
 
 
+# Hover lookup mode (enabled by setting the HOVER_LOOKUP environment variable to 1)
+# Points only carry their rule ID & numeric fields - antecedents & consequents are looked up on the server when a point is
+# hovered or clicked (see display_rule_details() & /rules/<rule_id> in app.py), so strings are never sent with the graph.
+hover_lookup = os.environ.get('HOVER_LOOKUP', '0') == '1'
 
+# Maximum number of individually plotted rules before level-of-detail mode is used (see below)
+lod_point_limit = int(os.environ.get('LOD_POINT_LIMIT', 20000))
 
-# Method to reformat review score using regex statement
-# FROM: review_score_bin_80-85      TO: Review Score: 80-85
-def reformat_review_score(antecedent):
-    match = re.match(r'review_bin_(\d+-\d+)', antecedent)
-    if match:
-        return f"Review Score: {match.group(1)}"    # Reformatting if antecedent contains review score
-    return antecedent
 
-# Applying method to string value of antecedents
-rules['antecedents_str'] = rules['antecedents_str'].apply(lambda x: ', '.join(map(reformat_review_score, x.split(', '))))
-
-
-
-# Plotting association rules as a scatter graph, specifying variables to display with hoverdata 
-# X: Support (modified to occurrences for interpretability)
-# Y: Confidence
-# Z: Lift (colour)
-fig = px.scatter(rules, x='occurrences', y='confidence', color='lift',
-                hover_data={"antecedents_str": True, "consequents_str": True, "lift": True, "occurrences": True},
-                render_mode='auto',
-                color_continuous_scale=px.colors.sequential.Plasma
-)
-
-
-# Custom hoverdata template (displaying occurrences instead of support)
-fig.update_traces(
-    
-    hovertemplate="<b>Antecedents:</b> %{customdata[0]}<br>" +
-                  "<b>Consequents:</b> %{customdata[1]}<br>" +
-                  "<b>Confidence:</b> %{y:.0%}<br>" +
-                  "<b>Occurrences:</b> %{customdata[3]}<br>" +
-                  "<b>Lift:</b> %{customdata[2]:.2f}<br>"                  
-)
-
-
-
-# Setting plotly graph controls
-fig.update_layout(dragmode='pan',
-                  uirevision='scatter'
-)
-
-
-# Setting plot background/container colours & x/y-axis labels
-fig.update_layout(
-    plot_bgcolor='#eeede7',
-    paper_bgcolor='#eeede7',
-    xaxis=dict(title='Occurrences'),
-    yaxis=dict(title='Confidence')
-)
-
-
-# Setting markers to diamond shape with yellow outline
-fig.update_traces(marker=dict(
-    symbol='diamond',
-    line=dict(
-        width=0.5,
-        color=('rgba(255,255,0,0.8)')
-    ),
-    size=8,
-    opacity=1
-))
-
-
-# Setting margins and x-axis label position to top
-fig.update_layout(
-    xaxis=dict(
-        side='top'
-    ),
-    margin=dict(
-        l=0,
-        r=0,
-        t=10,
-        b=10
+# Loading association rules
+# The binary artifact written by dataProcessing.py (rules.npz) is used when available - its items are already integer-encoded,
+# so no string parsing is required and review scores are reformatted once per item rather than once per rule.
+# rules.csv is only parsed as a fallback.
+rules_source = RULES_ARTIFACT if os.path.exists(RULES_ARTIFACT) else 'rules.csv'
+
+# Content hash of the loaded rules - used to key cached filter results in app.py, so results from a previous rules file are never reused
+rules_version = content_hash([rules_source])
+
+# Loading item vocabulary (every genre, theme & review bin)
+# The manifest written by dataProcessing.py (items.csv) is used when available - otherwise only the header rows
+# of the one-hot df_genres/df_themes/df_reviews.csv files are read, as their columns are the items of each category.
+vocabulary_sources = [ITEM_VOCABULARY] if os.path.exists(ITEM_VOCABULARY) else ['df_genres.csv', 'df_themes.csv', 'df_reviews.csv']
+
+
+
+# WARM-START SNAPSHOT
+# Setting the STARTUP_SNAPSHOT environment variable to a file path pickles everything prepared below (rule arrays, indexes,
+# dropdown item sets & figure) the first time the server starts, and loads it instead of recomputing on later starts.
+# The snapshot is rebuilt whenever the item vocabulary, the rules file, the code preparing them (this file, ruleIndex.py &
+# artifacts.py) or the settings above change.
+# NOTE: when loaded from a snapshot, fig is a plain figure dict rather than a go.Figure (dcc.Graph accepts either)
+snapshot_path = os.environ.get('STARTUP_SNAPSHOT')
+snapshot_state = ['genres', 'themes', 'reviews', 'rule_items', 'item_index',
+                  'antecedent_masks', 'consequent_masks', 'theme_mask', 'genre_mask',
+                  'slider_bounds', 'range_index', 'antecedent_postings', 'consequent_postings', 'rule_arrays', 'rule_strings', 'fig']
+
+snapshot = None
+if snapshot_path:
+    # The code that prepares the snapshot state is hashed too: this file, ruleIndex.py (masks & indexes) & artifacts.py (load_rules)
+    code_sources = [__file__] + [os.path.join(os.path.dirname(os.path.abspath(__file__)), name) for name in ['ruleIndex.py', 'artifacts.py']]
+    snapshot_key = content_hash(vocabulary_sources + [rules_source] + code_sources,
+                                hover_lookup, lod_point_limit)
+    snapshot = load_snapshot(snapshot_path, snapshot_key)
+    record_phase('hash sources' if snapshot is None else 'load snapshot')
+
+
+if snapshot is not None:
+    globals().update(snapshot)
+
+else:
+    # Initialising sets for themes & genres to import later in app.py & scatter.py
+    if vocabulary_sources == [ITEM_VOCABULARY]:
+        vocabulary = load_item_vocabulary(ITEM_VOCABULARY)
+    else:
+        vocabulary = {category: set(pd.read_csv(path, nrows=0).columns) for category, path in zip(['genre', 'theme', 'review'], vocabulary_sources)}
+
+    genres = vocabulary['genre']
+    themes = vocabulary['theme']
+    reviews = vocabulary['review']
+
+    record_phase('load item vocabulary')
+
+
+    if rules_source == RULES_ARTIFACT:
+        rules = load_rules(RULES_ARTIFACT, item_label=reformat_review_score)
+    else:
+        rules = pd.read_csv('rules.csv')
+
+        rules['antecedents'] = rules['antecedents'].apply(remove_frozen_string)
+        rules['consequents'] = rules['consequents'].apply(remove_frozen_string)
+
+        # Applying reformatting method to string value of antecedents
+        rules['antecedents_str'] = rules['antecedents_str'].apply(lambda x: ', '.join(map(reformat_review_score, x.split(', '))))
+
+    record_phase('load rules')
+
+
+    # Creating new column: Occurrences
+    # This is because the results of the support metric were too difficult to interpret
+    rules["occurrences"] = (rules["support"] * 31752).round() - 1
+
+
+    # Creating new columns: Review Min & Review Max
+    # The review bin within each rule's antecedents is extracted once here, so the review score slider in app.py
+    # can filter using a range comparison. Rules without a review bin in their antecedents are set to -1.
+    review_ranges = {item: get_review_bin_range(item) for item in set().union(*rules['antecedents']) if get_review_bin_range(item)}
+    review_bins = [min((item for item in antecedents if item in review_ranges), default=None) for antecedents in rules['antecedents']]
+
+    rules['review_min'] = [review_ranges[item][0] if item else -1 for item in review_bins]
+    rules['review_max'] = [review_ranges[item][1] if item else -1 for item in review_bins]
+
+    # Rule IDs are the row positions of each rule
+    rules['rule_id'] = np.arange(len(rules))
+
+    record_phase('derive columns')
+
+
+
+    # Precomputing bitmasks of each rule's antecedents & consequents, as well as masks for all themes, genres & review bins
+    # This allows app.py to filter rules using bitwise operations over NumPy arrays (see ruleIndex.py)
+    # NOTE: rows of antecedent_masks & consequent_masks line up with the rows of rules
+    # Every item appearing within at least one rule (used to filter the dropdown boxes in scatter.py)
+    rule_items = set().union(*rules['antecedents'], *rules['consequents'])
+
+    item_index = build_item_index(rule_items | themes | genres | reviews)
+
+    antecedent_masks = encode_masks(rules['antecedents'], item_index)
+    consequent_masks = encode_masks(rules['consequents'], item_index)
+
+    theme_mask = items_mask(themes, item_index)
+    genre_mask = items_mask(genres, item_index)
+
+
+
+    # Minimum & maximum values of each slider in scatter.py
+    slider_bounds = {column: (rules[column].min(), rules[column].max()) for column in ['occurrences', 'confidence', 'lift']}
+
+    # Building a range index over every column filtered by the sliders in app.py (see ruleIndex.py)
+    range_index = build_range_index(rules, ['occurrences', 'confidence', 'lift', 'review_min'])
+
+    # Building inverted indexes of item -> rule IDs for the theme & genre dropdowns, separately for each side of the rules
+    antecedent_postings = build_inverted_index(antecedent_masks, item_index)
+    consequent_postings = build_inverted_index(consequent_masks, item_index)
+
+    record_phase('build indexes')
+
+
+
+
+    # Plotting association rules as a scatter graph, specifying variables to display with hoverdata
+    # X: Support (modified to occurrences for interpretability)
+    # Y: Confidence
+    # Z: Lift (colour)
+    fig = px.scatter(rules, x='occurrences', y='confidence', color='lift',
+                    hover_data={"antecedents_str": True, "consequents_str": True, "lift": True, "occurrences": True},
+                    render_mode='webgl',
+                    color_continuous_scale=px.colors.sequential.Plasma
+    )
+
+    # Fixing the colour range to the lift of ALL rules (the scatter trace always uses WebGL rendering, see render_mode above)
+    # This is set once here, as the callback in app.py only updates the trace arrays (x, y, colour, customdata & hoverlabel)
+    fig.update_layout(coloraxis=dict(cmin=rules['lift'].min(), cmax=rules['lift'].max()))
+
+
+    # Hover lookup mode (see hover_lookup above)
+    if hover_lookup:
+        # Custom hoverdata template (displaying occurrences instead of support)
+        fig.update_traces(
+            customdata=rules[['lift', 'occurrences', 'rule_id']].to_numpy(),
+            hovertemplate="<b>Confidence:</b> %{y:.0%}<br>" +
+                          "<b>Occurrences:</b> %{customdata[1]}<br>" +
+                          "<b>Lift:</b> %{customdata[0]:.2f}<br>"
+        )
+
+    else:
+        # Hoverdata is split into strings (text: antecedents, hovertext: consequents) & numbers (customdata: lift, occurrences)
+        # This keeps customdata numeric, so it can be sent as a binary typed array by the callback in app.py
+        fig.update_traces(
+            customdata=rules[['lift', 'occurrences']].to_numpy(),
+            text=rules['antecedents_str'],
+            hovertext=rules['consequents_str']
+        )
+
+        # Custom hoverdata template (displaying occurrences instead of support)
+        fig.update_traces(
+
+            hovertemplate="<b>Antecedents:</b> %{text}<br>" +
+                          "<b>Consequents:</b> %{hovertext}<br>" +
+                          "<b>Confidence:</b> %{y:.0%}<br>" +
+                          "<b>Occurrences:</b> %{customdata[1]}<br>" +
+                          "<b>Lift:</b> %{customdata[0]:.2f}<br>"
+        )
+
+
+
+    # Setting plotly graph controls
+    fig.update_layout(dragmode='pan',
+                      uirevision='scatter'
+    )
+
+
+    # Setting plot background/container colours & x/y-axis labels
+    fig.update_layout(
+        plot_bgcolor='#eeede7',
+        paper_bgcolor='#eeede7',
+        xaxis=dict(title='Occurrences'),
+        yaxis=dict(title='Confidence')
     )
-)
 
 
-# Displaying custom axis zoom for scatter graph (to show 50% to 100% confidence in full)
-fig.update_layout(
-    yaxis=dict(range=[0.49, 1.01]),
-    yaxis_tickformat=".0%"
-)
+    # Setting markers to diamond shape with yellow outline
+    fig.update_traces(marker=dict(
+        symbol='diamond',
+        line=dict(
+            width=0.5,
+            color=('rgba(255,255,0,0.8)')
+        ),
+        size=8,
+        opacity=1
+    ))
+
+
+    # Setting margins and x-axis label position to top
+    fig.update_layout(
+        xaxis=dict(
+            side='top'
+        ),
+        margin=dict(
+            l=0,
+            r=0,
+            t=10,
+            b=10
+        )
+    )
 
 
-# This sets the background colour of the hoverlabel to match colour of 'lift' based off the maximum value of lift within rules.
-max_lift = rules['lift'].max()
-fig.update_traces(
-    hoverlabel=dict(
-        bgcolor=[
-            pc.sample_colorscale('Plasma', [lift / max_lift])[0]  
-                for lift in rules['lift']
-        ]
+    # Displaying custom axis zoom for scatter graph (to show 50% to 100% confidence in full)
+    fig.update_layout(
+        yaxis=dict(range=[0.49, 1.01]),
+        yaxis_tickformat=".0%"
     )
-)
 
 
+    # This sets the background colour of the hoverlabel to match colour of 'lift' based off the maximum value of lift within rules.
+    # Each rule's colour is looked up once from a quantized Plasma colour table (instead of interpolating the colorscale per rule),
+    # and stored in the hover_colour column so the callback in app.py only has to select the filtered rows.
+    hover_colour_levels = 1024
+    hover_colour_table = np.array(pc.sample_colorscale('Plasma', hover_colour_levels))
+
+    max_lift = rules['lift'].max()
+    rules['hover_colour'] = hover_colour_table[np.rint((rules['lift'] / max_lift).clip(0, 1) * (hover_colour_levels - 1)).astype(int)]
+
+    fig.update_traces(
+        hoverlabel=dict(
+            bgcolor=rules['hover_colour'].tolist()
+        )
+    )
+
+
+
+    # LEVEL-OF-DETAIL MODE
+    # When more than lod_point_limit rules are visible, the callback in app.py plots a binned aggregate of the visible window
+    # (occurrences x confidence, coloured by max lift) within this second trace, instead of plotting every rule individually.
+    # Zooming in (until fewer than lod_point_limit rules are visible) displays the individual rules again.
+    fig.add_trace(go.Scattergl(
+        x=[], y=[],
+        mode='markers',
+        marker=dict(symbol='square', size=10, color=[], coloraxis='coloraxis'),
+        customdata=[],
+        hovertemplate="<b>Rules:</b> %{customdata[0]}<br>" +
+                      "<b>Max Lift:</b> %{customdata[1]:.2f}<extra></extra>",
+        showlegend=False
+    ))
+
+    # Individual rules are only included in the initial figure if there are few enough to plot (the callback fills in the aggregate)
+    if len(rules) > lod_point_limit:
+        fig.update_traces(x=[], y=[], customdata=[], text=[], hovertext=[], marker_color=[], hoverlabel_bgcolor=[], selector=0)
+
+    record_phase('build figure')
 
 
+    # Every column of rules read by the callbacks in app.py, stored as NumPy arrays (hover colours as a fixed-width unicode array,
+    # antecedent & consequent strings packed into a single UTF-8 buffer each - see pack_strings() in artifacts.py)
+    # Unlike the object columns of rules, reading these never writes to their memory (no Python object reference counts are
+    # updated), so when gunicorn preloads the app (see gunicorn.conf.py) all workers share a single copy of them
+    rule_arrays = {column: np.ascontiguousarray(rules[column].to_numpy()) for column in ['occurrences', 'confidence', 'lift', 'rule_id']}
+    rule_arrays['hover_colour'] = np.ascontiguousarray(rules['hover_colour'].to_numpy(dtype=str))
+    rule_strings = {column: pack_strings(rules[column]) for column in ['antecedents_str', 'consequents_str']}
 
+    # The rules DataFrame is not read after this point, so it is released rather than kept alongside the arrays above
+    del rules
 
+    record_phase('build rule arrays')
 
 
+    # Writing the warm-start snapshot for the next start (see above)
+    if snapshot_path:
+        fig = fig.to_dict()
+        save_snapshot({name: globals()[name] for name in snapshot_state}, snapshot_key, snapshot_path)
+        record_phase('save snapshot')